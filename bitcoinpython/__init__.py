@@ -1,12 +1,24 @@
-from bitcoinpython.format import verify_sig
+from bitcoinpython.addressindex import AddressIndex
+from bitcoinpython.format import addresses_from_public_keys, verify_sig
+from bitcoinpython.keycache import set_derivation_cache
+from bitcoinpython.network.cache import set_response_cache
 from bitcoinpython.network.rates import SUPPORTED_CURRENCIES, set_rate_cache_time
-from bitcoinpython.network.services import set_service_timeout
-from bitcoinpython.wallet import Key, PrivateKey, wif_to_key
-from bitcoinpython.public_information import get_balance, get_transactions, get_balance_btc, get_transactions_btc, get_transaction, get_transaction_btc,_get_unspent,_get_unspent_btc
+from bitcoinpython.network.txstore import set_transaction_store
+from bitcoinpython.network.services import (
+    set_adaptive_ordering, set_hedging, set_service_timeout, set_session_options
+)
+from bitcoinpython.rawtx import parse_transaction
+from bitcoinpython.transaction import set_parallel_signing_threshold, set_script_cache_size
+from bitcoinpython.wallet import Key, PrivateKey, get_unspents_many, keys_from_wifs, wif_to_key
+from bitcoinpython.public_information import get_balance, get_balances, get_transactions, iter_transactions, get_balance_btc, get_transactions_btc, get_transaction, get_transaction_btc,_get_unspent,_get_unspent_btc
 
 
-__all__ = ['verify_sig', 'SUPPORTED_CURRENCIES', 'set_rate_cache_time',
-           'set_service_timeout', 'Key', 'PrivateKey', 'wif_to_key',
-           'get_balance', 'get_transactions', 'get_balance_btc',
+__all__ = ['verify_sig', 'addresses_from_public_keys', 'SUPPORTED_CURRENCIES', 'set_rate_cache_time',
+           'set_response_cache', 'set_transaction_store',
+           'set_service_timeout', 'set_session_options', 'set_hedging',
+           'set_adaptive_ordering', 'set_parallel_signing_threshold', 'set_script_cache_size',
+           'set_derivation_cache', 'Key', 'PrivateKey', 'wif_to_key',
+           'keys_from_wifs', 'get_unspents_many', 'parse_transaction', 'AddressIndex',
+           'get_balance', 'get_balances', 'get_transactions', 'iter_transactions', 'get_balance_btc',
            'get_transactions_btc', 'get_transaction', 'get_transaction_btc',
            '_get_unspent','_get_unspent_btc']
@@ -0,0 +1,197 @@
+from math import ceil, log
+
+from bitcoinpython.base58 import b58decode_check
+from bitcoinpython.exceptions import InvalidAddress
+from bitcoinpython.format import (
+    MAIN_PUBKEY_HASH, MAIN_SCRIPT_HASH, TEST_PUBKEY_HASH, TEST_SCRIPT_HASH,
+    address_to_public_key_hash
+)
+
+HASH160_SIZE = 20
+LEGACY_VERSIONS = (MAIN_PUBKEY_HASH, MAIN_SCRIPT_HASH, TEST_PUBKEY_HASH, TEST_SCRIPT_HASH)
+
+# The share of absent hashes the Bloom filter lets through by default.
+DEFAULT_FALSE_POSITIVE_RATE = 0.01
+
+
+def address_to_hash160(address):
+    """The hash paid to by a cash address or a legacy base58 address.
+
+    :raises InvalidAddress: If ``address`` is neither.
+    :rtype: ``bytes``
+    """
+    if ':' in address:
+        return address_to_public_key_hash(address)[0]
+
+    try:
+        decoded = b58decode_check(address)
+    except ValueError:
+        raise InvalidAddress('{} is not a valid address.'.format(address))
+
+    if len(decoded) != HASH160_SIZE + 1 or decoded[:1] not in LEGACY_VERSIONS:
+        raise InvalidAddress('{} is not a valid address.'.format(address))
+
+    return decoded[1:]
+
+
+class BloomFilter:
+    """A Bloom filter over hash160s. The hashes are uniformly distributed
+    already, so the bit positions are taken from their bytes directly
+    instead of hashing them again.
+
+    :param n_items: The number of hashes it is sized for.
+    :type n_items: ``int``
+    :param false_positive_rate: The share of absent hashes reported present
+                                once ``n_items`` are added.
+    :type false_positive_rate: ``float``
+    """
+    __slots__ = ('n_bits', 'n_hashes', 'bits')
+
+    def __init__(self, n_items, false_positive_rate=DEFAULT_FALSE_POSITIVE_RATE):
+        n_items = max(n_items, 1)
+        self.n_bits = max(ceil(-n_items * log(false_positive_rate) / log(2) ** 2), 8)
+        self.n_hashes = max(round(self.n_bits / n_items * log(2)), 1)
+        self.bits = bytearray((self.n_bits + 7) // 8)
+
+    def _positions(self, hash160):
+        # Double hashing with two independent halves of the hash.
+        first = int.from_bytes(hash160[:8], 'little')
+        second = int.from_bytes(hash160[8:16], 'little') | 1
+        n_bits = self.n_bits
+        return [(first + i * second) % n_bits for i in range(self.n_hashes)]
+
+    def add(self, hash160):
+        bits = self.bits
+        for position in self._positions(hash160):
+            bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, hash160):
+        bits = self.bits
+        for position in self._positions(hash160):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+
+class AddressIndex:
+    """A set of addresses keyed by the raw hash160 they pay to, so outputs
+    parsed with :mod:`bitcoinpython.rawtx` are matched by their script bytes
+    without encoding any address.
+
+    >>> index = AddressIndex(addresses)
+    >>> mine = [output for output in tx.outputs if output.hash160_view() in index]
+
+    It can be passed as the watched set of
+    :func:`~bitcoinpython.blockfile.iter_block_file`.
+
+    :param addresses: Cash or legacy addresses.
+    :type addresses: iterable of ``str``
+    :param bloom: Whether to check a Bloom filter first, which answers most
+                  lookups of absent hashes without a bisection. Defaults to
+                  ``compact``, as it is slower than a ``set`` lookup.
+    :type bloom: ``bool`` or ``None``
+    :param compact: Whether to keep the hashes in one sorted byte string
+                    searched by bisection, using about 20 bytes per address
+                    instead of a ``set`` of ``bytes`` objects.
+    :type compact: ``bool``
+    :param false_positive_rate: See :class:`BloomFilter`.
+    :type false_positive_rate: ``float``
+    """
+
+    def __init__(self, addresses=(), bloom=None, compact=False,
+                 false_positive_rate=DEFAULT_FALSE_POSITIVE_RATE):
+        self._init_hashes(
+            {address_to_hash160(address) for address in addresses},
+            bloom, compact, false_positive_rate
+        )
+
+    @classmethod
+    def from_hash160s(cls, hash160s, bloom=None, compact=False,
+                      false_positive_rate=DEFAULT_FALSE_POSITIVE_RATE):
+        """Builds an index from raw 20 byte hashes.
+
+        :rtype: :class:`AddressIndex`
+        """
+        index = cls.__new__(cls)
+        index._init_hashes({bytes(hash160) for hash160 in hash160s},
+                           bloom, compact, false_positive_rate)
+        return index
+
+    def _init_hashes(self, hashes, bloom, compact, false_positive_rate):
+        if any(len(hash160) != HASH160_SIZE for hash160 in hashes):
+            raise ValueError('Hashes must be {} bytes.'.format(HASH160_SIZE))
+
+        if bloom is None:
+            bloom = compact
+
+        self.bloom = None
+        if bloom:
+            self.bloom = BloomFilter(len(hashes), false_positive_rate)
+            for hash160 in hashes:
+                self.bloom.add(hash160)
+
+        self._length = len(hashes)
+        if compact:
+            self._hashes = None
+            self._sorted = b''.join(sorted(hashes))
+        else:
+            self._hashes = hashes
+            self._sorted = None
+
+    def _bisect(self, hash160):
+        data = self._sorted
+        low, high = 0, self._length
+
+        while low < high:
+            middle = (low + high) // 2
+            start = middle * HASH160_SIZE
+            candidate = data[start:start + HASH160_SIZE]
+            if candidate == hash160:
+                return True
+            elif candidate < hash160:
+                low = middle + 1
+            else:
+                high = middle
+
+        return False
+
+    def __contains__(self, hash160):
+        """Whether ``hash160``, as ``bytes`` or a ``memoryview`` slice, is
+        in the index."""
+        if self.bloom is not None and hash160 not in self.bloom:
+            return False
+
+        hash160 = bytes(hash160)
+
+        if self._hashes is not None:
+            return hash160 in self._hashes
+        return self._bisect(hash160)
+
+    def contains_address(self, address):
+        return address_to_hash160(address) in self
+
+    def match_outputs(self, outputs):
+        """The outputs paying to an address in the index.
+
+        :type outputs: iterable of :class:`~bitcoinpython.rawtx.RawTxOut`
+        :rtype: ``list``
+        """
+        matched = []
+        for output in outputs:
+            hash160 = output.hash160_view()
+            if hash160 is not None and hash160 in self:
+                matched.append(output)
+        return matched
+
+    def __iter__(self):
+        if self._hashes is not None:
+            return iter(self._hashes)
+
+        data = self._sorted
+        return (
+            data[start:start + HASH160_SIZE]
+            for start in range(0, len(data), HASH160_SIZE)
+        )
+
+    def __len__(self):
+        return self._length
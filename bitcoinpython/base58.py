@@ -3,26 +3,85 @@ from collections import deque
 from bitcoinpython.crypto import double_sha256_checksum
 from bitcoinpython.utils import int_to_unknown_bytes
 
+try:
+    from based58 import b58decode as _ext_b58decode, b58encode as _ext_b58encode
+except ImportError:  # pragma: no cover
+    _ext_b58decode = _ext_b58encode = None
+
 BASE58_ALPHABET = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
 BASE58_ALPHABET_LIST = list(BASE58_ALPHABET)
 BASE58_ALPHABET_INDEX = {char: index for index, char in enumerate(BASE58_ALPHABET)}
 
+# Maps every byte to its base58 digit, or 0xff if it isn't one.
+BASE58_DIGITS = bytes(
+    BASE58_ALPHABET_INDEX.get(chr(byte), 0xff) for byte in range(256)
+)
 
-def b58encode(bytestr):
+# Big ints are split into limbs of 10 base58 digits, so most of the work
+# happens on small ints. Limbs are encoded as 5 pairs of digits.
+BASE58_PAIRS = [a + b for a in BASE58_ALPHABET for b in BASE58_ALPHABET]
+BASE58_PAIR = 58 ** 2
+BASE58_LIMB_DIGITS = 10
+BASE58_LIMB = 58 ** BASE58_LIMB_DIGITS
 
-    alphabet = BASE58_ALPHABET_LIST
 
-    encoded = deque()
-    append = encoded.appendleft
+def _b58encode_limbs(num):
+
+    pairs = BASE58_PAIRS
+    pair = BASE58_PAIR
+    limb_size = BASE58_LIMB
     _divmod = divmod
 
-    num = int.from_bytes(bytestr, 'big')
+    encoded = deque()
+    append = encoded.appendleft
 
     while num > 0:
-        num, rem = _divmod(num, 58)
-        append(alphabet[rem])
+        num, limb = _divmod(num, limb_size)
+        for _ in range(5):
+            limb, rem = _divmod(limb, pair)
+            append(pairs[rem])
+
+    # The most significant limb is zero padded.
+    return ''.join(encoded).lstrip('1')
+
+
+def _b58decode_limbs(string):
+
+    try:
+        digits = string.encode('ascii').translate(BASE58_DIGITS)
+    except UnicodeEncodeError:
+        digits = b'\xff'
+
+    if b'\xff' in digits:
+        for char in string:
+            if char not in BASE58_ALPHABET_INDEX:
+                raise ValueError('"{}" is an invalid base58 encoded '
+                                 'character.'.format(char))
+
+    limb_digits = BASE58_LIMB_DIGITS
+    limb_size = BASE58_LIMB
+    head = len(digits) % limb_digits
+
+    # Leading digits that don't fill a whole limb.
+    num = 0
+    for digit in digits[:head]:
+        num = num * 58 + digit
+
+    for i in range(head, len(digits), limb_digits):
+        limb = 0
+        for digit in digits[i:i + limb_digits]:
+            limb = limb * 58 + digit
+        num = num * limb_size + limb
 
-    encoded = ''.join(encoded)
+    return num
+
+
+def b58encode(bytestr):
+
+    if _ext_b58encode is not None:
+        return _ext_b58encode(bytes(bytestr)).decode()
+
+    encoded = _b58encode_limbs(int.from_bytes(bytestr, 'big'))
 
     pad = 0
     for byte in bytestr:
@@ -38,28 +97,29 @@ def b58encode_check(bytestr):
     return b58encode(bytestr + double_sha256_checksum(bytestr))
 
 
-def b58decode(string):
+def b58encode_check_many(bytestrs):
+    """Encodes each of ``bytestrs`` with :func:`b58encode_check`.
 
-    alphabet_index = BASE58_ALPHABET_INDEX
+    :rtype: ``list`` of ``str``
+    """
+    checksum = double_sha256_checksum
+    encode = b58encode
+    return [encode(bytestr + checksum(bytestr)) for bytestr in bytestrs]
 
-    num = 0
 
-    try:
-        for char in string:
-            num *= 58
-            num += alphabet_index[char]
-    except KeyError:
-        raise ValueError('"{}" is an invalid base58 encoded '
-                         'character.'.format(char)) from None
+def b58decode(string):
 
-    bytestr = int_to_unknown_bytes(num)
+    pad = len(string) - len(string.lstrip('1'))
 
-    pad = 0
-    for char in string:
-        if char == '1':
-            pad += 1
-        else:
-            break
+    # An all zero input keeps the historical extra null byte below.
+    if _ext_b58decode is not None and pad < len(string):
+        try:
+            return _ext_b58decode(string.encode())
+        except ValueError:
+            # Re-raised below with the usual message.
+            pass
+
+    bytestr = int_to_unknown_bytes(_b58decode_limbs(string))
 
     return b'\x00' * pad + bytestr
 
@@ -76,3 +136,11 @@ def b58decode_check(string):
                          'checksum {}.'.format(decoded_checksum, string, hash_checksum))
 
     return shortened
+
+
+def b58decode_check_many(strings):
+    """Decodes each of ``strings`` with :func:`b58decode_check`.
+
+    :rtype: ``list`` of ``bytes``
+    """
+    return [b58decode_check(string) for string in strings]
@@ -0,0 +1,157 @@
+import mmap
+import os
+
+from bitcoinpython.crypto import double_sha256
+from bitcoinpython.rawtx import parse_transaction, read_transaction, read_varint
+from bitcoinpython.utils import bytes_to_hex
+
+# The bytes starting every block in a node's blk*.dat files.
+MAIN_MAGIC = bytes.fromhex('e3e1f3e8')
+TEST_MAGIC = bytes.fromhex('f4e5f3f4')
+
+BLOCK_HEADER_SIZE = 80
+
+
+class TransactionFilter:
+    """Decides which transactions of a scan concern a set of watched
+    hashes. A transaction matches if one of its outputs pays to a watched
+    hash, or one of its inputs spends such an output seen earlier in the
+    scan. Only the outpoints of matching outputs are remembered.
+
+    :param watched: The hash160s to look for, as any container of 20 byte
+                    hashes supporting ``in``, or ``None`` to match everything.
+    """
+
+    def __init__(self, watched):
+        self.watched = watched
+        self.outpoints = set()
+
+    def matches(self, tx):
+        watched = self.watched
+
+        if watched is None:
+            return True
+
+        outpoints = self.outpoints
+        matched = False
+
+        if outpoints:
+            for txin in tx.inputs:
+                outpoint = txin.outpoint.tobytes()
+                if outpoint in outpoints:
+                    # An output can only be spent once.
+                    outpoints.discard(outpoint)
+                    matched = True
+
+        for index, output in enumerate(tx.outputs):
+            hash160 = output.hash160_view()
+            if hash160 is not None and hash160 in watched:
+                outpoints.add(tx.hash + index.to_bytes(4, byteorder='little'))
+                matched = True
+
+        return matched
+
+
+def iter_block_transactions(view, tx_filter, magic=MAIN_MAGIC):
+    """Decodes the blocks in ``view``, laid out as in a node's blk*.dat
+    files, and yields the transactions ``tx_filter`` matches. Each is copied
+    out of ``view``, so it outlives it.
+    """
+    offset = 0
+    end_of_data = len(view)
+
+    while offset + 8 <= end_of_data:
+        # Files are preallocated, so zeros follow the last block.
+        if view[offset:offset + 4] != magic:
+            break
+
+        start = offset + 8
+        end = start + int.from_bytes(view[offset + 4:start], 'little')
+        if end > end_of_data:
+            raise ValueError('Truncated block at offset {}.'.format(offset))
+
+        block = bytes_to_hex(double_sha256(view[start:start + BLOCK_HEADER_SIZE])[::-1])
+        n_transactions, position = read_varint(view, start + BLOCK_HEADER_SIZE)
+
+        for _ in range(n_transactions):
+            tx, position = read_transaction(view, position)
+            if tx_filter.matches(tx):
+                yield parse_transaction(tx.to_bytes(), block=block)
+            # Drop the slice of ``view``, so that an error raised later does
+            # not keep it alive and the file can still be unmapped.
+            tx = None
+
+        if position != end:
+            raise ValueError('Block at offset {} does not match its size.'.format(offset))
+
+        offset = end
+
+
+def iter_block_file(path, watched=None, magic=MAIN_MAGIC, tx_filter=None):
+    """Reads a file of raw blocks, such as a node's blk*.dat files, through
+    ``mmap`` and yields the transactions concerning ``watched``. Memory use
+    does not grow with the size of the file.
+
+    :param path: The file.
+    :type path: ``str``
+    :param watched: The hash160s to look for, see :class:`TransactionFilter`.
+    :param magic: The bytes starting every block.
+    :type magic: ``bytes``
+    :param tx_filter: A filter to share between files, to follow outputs
+                      across them. By default a new one matching ``watched``.
+    :type tx_filter: :class:`TransactionFilter`
+    :rtype: generator of :class:`~bitcoinpython.rawtx.RawTransaction`
+    """
+    if tx_filter is None:
+        tx_filter = TransactionFilter(watched)
+
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    try:
+        with memoryview(mapped) as view:
+            yield from iter_block_transactions(view, tx_filter, magic)
+    finally:
+        try:
+            mapped.close()
+        except BufferError:
+            # Slices of the file are still referenced, e.g. by a custom
+            # filter's traceback. It is unmapped once they are collected,
+            # and the error being raised, if any, is not hidden.
+            pass
+
+
+def iter_block_files(paths, watched=None, magic=MAIN_MAGIC):
+    """Like :func:`iter_block_file` for several files in order, following
+    watched outputs from one file to the next."""
+    tx_filter = TransactionFilter(watched)
+
+    for path in paths:
+        yield from iter_block_file(path, magic=magic, tx_filter=tx_filter)
+
+
+def iter_hex_file(path, watched=None, tx_filter=None):
+    """Reads a file of hex encoded raw transactions, one per line, and yields
+    the ones concerning ``watched``, one line at a time.
+
+    :param path: The file.
+    :type path: ``str``
+    :param watched: The hash160s to look for, see :class:`TransactionFilter`.
+    :param tx_filter: A filter to use instead of one matching ``watched``.
+    :type tx_filter: :class:`TransactionFilter`
+    :rtype: generator of :class:`~bitcoinpython.rawtx.RawTransaction`
+    """
+    if tx_filter is None:
+        tx_filter = TransactionFilter(watched)
+
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+
+            tx = parse_transaction(line)
+            if tx_filter.matches(tx):
+                yield tx
@@ -1,6 +1,8 @@
+import json
+
 import click
 
-from bitcoinpython.keygen import generate_matching_address
+from bitcoinpython.keygen import generate_matching_address, search_matching_address
 
 
 @click.group(invoke_without_command=True)
@@ -11,5 +13,13 @@ def bitcoinpython():
 @bitcoinpython.command()
 @click.argument('prefix')
 @click.option('--cores', '-c', default='all')
-def gen(prefix, cores):
-    click.echo(generate_matching_address(prefix, cores))
+@click.option('--format', '-f', 'address_format', default='legacy',
+              type=click.Choice(['legacy', 'cashaddr']))
+@click.option('--json-progress', is_flag=True,
+              help='Print progress and the result as one JSON object per line.')
+def gen(prefix, cores, address_format, json_progress):
+    if json_progress:
+        for progress in search_matching_address(prefix, cores, address_format=address_format):
+            click.echo(json.dumps(progress.to_dict()))
+    else:
+        click.echo(generate_matching_address(prefix, cores, address_format=address_format))
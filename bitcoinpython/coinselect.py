@@ -0,0 +1,242 @@
+import random
+
+from bitcoinpython.exceptions import InsufficientFunds
+from bitcoinpython.transaction import P2PKH_OUTPUT_SIZE, input_size
+
+# Change below this many satoshi is left to the miners instead of creating
+# an output nobody can economically spend.
+DUST_LIMIT = 546
+
+# Branch and bound gives up after this many steps and falls back to
+# largest-first.
+BNB_MAX_TRIES = 100000
+
+# Random-improve stops adding inputs once change reaches this multiple of
+# the amount sent, aiming for change about the size of the payment.
+RANDOM_IMPROVE_IDEAL = 2
+RANDOM_IMPROVE_MAX = 3
+
+
+class FeeModel:
+    """The fee of a transaction in satoshi as inputs are added to it.
+
+    :param size: The size of the transaction without inputs or change.
+    :type size: :class:`~bitcoinpython.transaction.TxSize`
+    :param satoshis: The fee rate in satoshi per byte.
+    :param compressed: Whether the inputs are signed by a compressed key.
+    :param change_size: The size of the change output.
+    """
+    __slots__ = ('size', 'satoshis', 'compressed', 'change_size', 'input_size', 'input_fee',
+                 'change_cost')
+
+    def __init__(self, size, satoshis, compressed=True, change_size=P2PKH_OUTPUT_SIZE):
+        self.size = size
+        self.satoshis = satoshis
+        self.compressed = compressed
+        self.change_size = change_size
+        self.input_size = input_size(compressed)
+        self.input_fee = self.input_size * satoshis
+        # Creating a change output now and spending it later.
+        self.change_cost = change_size * satoshis + self.input_fee
+
+    def fee(self, n_inputs, change=True):
+        if change:
+            size = self.size.size(n_inputs, n_inputs * self.input_size, 1, self.change_size)
+        else:
+            size = self.size.size(n_inputs, n_inputs * self.input_size)
+        return size * self.satoshis
+
+
+def _finish(selected, total, target, model):
+    """Decides whether ``selected`` pays for ``target`` with change, without
+    change, or not at all, returning the change or ``None``."""
+    change = total - target - model.fee(len(selected), change=True)
+    if change >= DUST_LIMIT:
+        return change
+    if total - target - model.fee(len(selected), change=False) >= 0:
+        return 0
+    return None
+
+
+def _accumulate(candidates, target, model):
+    selected = []
+    total = 0
+
+    for unspent in candidates:
+        # An input worth less than its own fee only makes things worse.
+        if unspent.amount <= model.input_fee:
+            continue
+        selected.append(unspent)
+        total += unspent.amount
+        if total >= target + model.fee(len(selected), change=False):
+            change = _finish(selected, total, target, model)
+            if change is not None:
+                return selected, change
+
+    raise InsufficientFunds('Balance {} is less than {} (including '
+                            'fee).'.format(total, target + model.fee(len(selected))))
+
+
+def largest_first(candidates, target, model):
+    """Spends the largest unspents first, using as few inputs as possible."""
+    return _accumulate(reversed(candidates), target, model)
+
+
+def smallest_first(candidates, target, model):
+    """Spends the smallest unspents first, consolidating dust-like outputs
+    while fees are low."""
+    return _accumulate(candidates, target, model)
+
+
+def branch_and_bound(candidates, target, model):
+    """Searches for a set of unspents paying for ``target`` closely enough
+    that no change output is needed, wasting less than the cost of one.
+    Falls back to :func:`largest_first` if there is none.
+
+    The search walks the unspents largest first by their value net of their
+    own fee, including or omitting each, and prunes branches that overshoot
+    or can no longer reach the target.
+    """
+    input_fee = model.input_fee
+    low = target + model.fee(0, change=False)
+    high = low + model.change_cost
+
+    # A single unspent worth more than the upper bound is in no solution.
+    pool = [
+        unspent for unspent in reversed(candidates)
+        if input_fee < unspent.amount <= high + input_fee
+    ]
+    values = [unspent.amount - input_fee for unspent in pool]
+
+    available = sum(values)
+    if available < low:
+        return largest_first(candidates, target, model)
+
+    best = None
+    best_excess = None
+    included = []
+    total = 0
+    index = 0
+
+    for _ in range(BNB_MAX_TRIES):
+        if total + available < low or total > high:
+            backtrack = True
+        elif total >= low:
+            backtrack = True
+            if best_excess is None or total - low < best_excess:
+                best, best_excess = list(included), total - low
+                if best_excess == 0:
+                    break
+        else:
+            backtrack = False
+
+        if backtrack:
+            if not included:
+                break
+            # Give back the values skipped past the last inclusion, then
+            # try the branch omitting it.
+            index -= 1
+            while index > included[-1]:
+                available += values[index]
+                index -= 1
+            total -= values[index]
+            included.pop()
+        else:
+            available -= values[index]
+            # Omitting a value then including an equal one repeats a branch.
+            if (not included or included[-1] == index - 1 or
+                    values[index] != values[index - 1]):
+                included.append(index)
+                total += values[index]
+
+        index += 1
+
+    if best is not None:
+        selected = [pool[i] for i in best]
+        change = _finish(selected, sum(unspent.amount for unspent in selected), target, model)
+        if change is not None:
+            return selected, change
+
+    return largest_first(candidates, target, model)
+
+
+def random_improve(candidates, target, model, rng=random):
+    """Picks unspents at random until the payment is covered, then keeps
+    adding random ones while that brings change closer to
+    ``RANDOM_IMPROVE_IDEAL`` times the payment, without exceeding
+    ``RANDOM_IMPROVE_MAX`` times it. Over time this keeps the unspent set
+    spread out across amounts, which suits wallets making many payments.
+    """
+    order = rng.sample(range(len(candidates)), len(candidates))
+    selected = []
+    total = 0
+    position = 0
+
+    for position, index in enumerate(order, 1):
+        unspent = candidates[index]
+        if unspent.amount <= model.input_fee:
+            continue
+        selected.append(unspent)
+        total += unspent.amount
+        if total >= target + model.fee(len(selected), change=False):
+            break
+
+    change = _finish(selected, total, target, model)
+    if change is None:
+        raise InsufficientFunds('Balance {} is less than {} (including '
+                                'fee).'.format(total, target + model.fee(len(selected))))
+
+    ideal = RANDOM_IMPROVE_IDEAL * target
+    limit = RANDOM_IMPROVE_MAX * target
+
+    for index in order[position:]:
+        unspent = candidates[index]
+        if unspent.amount <= model.input_fee:
+            continue
+        new_total = total + unspent.amount
+        new_change = new_total - target - model.fee(len(selected) + 1)
+        if abs(ideal - new_change) >= abs(ideal - change) or new_change > limit:
+            break
+        # Change below the dust limit would make the transaction non-standard.
+        if new_change < DUST_LIMIT:
+            continue
+        selected.append(unspent)
+        total = new_total
+        change = new_change
+
+    return selected, change
+
+
+STRATEGIES = {
+    'bnb': branch_and_bound,
+    'largest_first': largest_first,
+    'smallest_first': smallest_first,
+    'random_improve': random_improve,
+}
+
+
+def select_coins(unspents, target, model, strategy='bnb'):
+    """Chooses the unspents paying for ``target`` satoshi plus fees.
+
+    :param unspents: The unspents to choose from.
+    :type unspents: ``list`` of :class:`~bitcoinpython.network.meta.Unspent`
+    :param target: The amount sent, excluding fees and change.
+    :type target: ``int``
+    :param model: The fee of the transaction being built.
+    :type model: :class:`FeeModel`
+    :param strategy: The name of one of :data:`STRATEGIES`, or a function
+                     taking the unspents sorted by amount, ``target`` and
+                     ``model`` and returning the chosen unspents and change.
+    :type strategy: ``str`` or ``function``
+    :raises InsufficientFunds: If the unspents cannot pay for ``target``.
+    :returns: The chosen unspents and the change, 0 if there is none.
+    :rtype: ``tuple``
+    """
+    if not callable(strategy):
+        try:
+            strategy = STRATEGIES[strategy]
+        except KeyError:
+            raise ValueError('Unknown coin selection strategy {}.'.format(strategy))
+
+    candidates = sorted(unspents, key=lambda unspent: unspent.amount)
+    return strategy(candidates, target, model)
@@ -1,10 +1,16 @@
+from functools import reduce as _reduce
+from multiprocessing import Pool
+from operator import xor
+
 from cashaddress import convert as cashaddress
+from cashaddress.crypto import CHARSET as CASHADDR_CHARSET
 from coincurve import verify_signature as _vs
 
 from bitcoinpython.base58 import b58decode_check, b58encode_check
 from bitcoinpython.crypto import ripemd160_sha256
 from bitcoinpython.curve import x_to_y
 from bitcoinpython.exceptions import InvalidAddress
+from bitcoinpython.utils import chunk_data, get_core_count
 
 MAIN_PUBKEY_HASH = b'\x00'
 MAIN_SCRIPT_HASH = b'\x05'
@@ -22,6 +28,19 @@ PUBLIC_KEY_COMPRESSED_EVEN_Y = b'\x02'
 PUBLIC_KEY_COMPRESSED_ODD_Y = b'\x03'
 PRIVATE_KEY_COMPRESSED_PUBKEY = b'\x01'
 
+CASHADDR_MAIN_PREFIX = 'bitcoincash'
+CASHADDR_TEST_PREFIX = 'bchtest'
+CASHADDR_P2PKH = 0x00
+CASHADDR_P2SH = 0x08
+CASHADDR_GENERATOR = (0x98f2bc8e61, 0x79b76d99e2, 0xf33e5fb3c4, 0xae2eabe2a8, 0x1e4f43e470)
+# The generator terms xored in for every possible top 5 bits of the state.
+CASHADDR_POLYMOD_TABLE = tuple(
+    _reduce(xor, (g for i, g in enumerate(CASHADDR_GENERATOR) if (top >> i) & 1), 0)
+    for top in range(32)
+)
+
+BULK_CHUNK_SIZE = 1000
+
 
 def verify_sig(signature, data, public_key):
     """Verifies some data was signed by the owner of a public key.
@@ -133,6 +152,81 @@ def public_key_to_address(public_key, version='main'):
     return address.cash_address()
 
 
+def cashaddr_polymod(values, chk=1):
+    """Runs the cashaddr checksum over ``values``, starting from the
+    intermediate state ``chk`` so a common prefix need only be fed once.
+    """
+    table = CASHADDR_POLYMOD_TABLE
+    for value in values:
+        chk = (((chk & 0x07ffffffff) << 5) ^ value) ^ table[chk >> 35]
+    return chk
+
+
+CASHADDR_PREFIX_STATES = {
+    prefix: cashaddr_polymod([ord(char) & 0x1f for char in prefix] + [0])
+    for prefix in (CASHADDR_MAIN_PREFIX, CASHADDR_TEST_PREFIX)
+}
+
+
+def hash160_to_cashaddr(hash160, prefix=CASHADDR_MAIN_PREFIX, version=CASHADDR_P2PKH):
+    """Encodes a 20 byte hash as a cash address without going through
+    ``cashaddress.Address``.
+    """
+    # 21 bytes of version and hash are padded to 170 bits, 34 groups of 5.
+    num = int.from_bytes(bytes((version,)) + hash160, 'big') << 2
+    payload = [(num >> shift) & 0x1f for shift in range(165, -5, -5)]
+
+    poly = cashaddr_polymod(payload + [0] * 8, CASHADDR_PREFIX_STATES[prefix]) ^ 1
+    checksum = [(poly >> shift) & 0x1f for shift in range(35, -5, -5)]
+
+    return prefix + ':' + ''.join([CASHADDR_CHARSET[char] for char in payload + checksum])
+
+
+def _public_keys_to_addresses(args):
+    public_keys, prefix = args
+    addresses = []
+
+    for public_key in public_keys:
+        if len(public_key) not in (33, 65):
+            raise ValueError('{} is an invalid length for a public key.'.format(len(public_key)))
+        addresses.append(hash160_to_cashaddr(ripemd160_sha256(public_key), prefix))
+
+    return addresses
+
+
+def addresses_from_public_keys(public_keys, version='main', cores=1, chunk_size=BULK_CHUNK_SIZE):
+    """Derives the cash address of many public keys at once. The result is
+    the same as calling :func:`public_key_to_address` on each key.
+
+    :param public_keys: The public keys, compressed or uncompressed.
+    :type public_keys: iterable of ``bytes``
+    :param version: ``'main'`` or ``'test'``.
+    :type version: ``str``
+    :param cores: The number of processes to spread the chunks over, or
+                  ``'all'``.
+    :type cores: ``int`` or ``str``
+    :param chunk_size: The number of keys handled per chunk.
+    :type chunk_size: ``int``
+    :rtype: ``list`` of ``str``
+    """
+    if version == 'test':
+        prefix = CASHADDR_TEST_PREFIX
+    elif version == 'main':
+        prefix = CASHADDR_MAIN_PREFIX
+    else:
+        raise ValueError('Invalid version.')
+
+    chunks = ((chunk, prefix) for chunk in chunk_data(list(public_keys), chunk_size))
+    cores = get_core_count(cores)
+
+    if cores == 1:
+        return [address for chunk in chunks for address in _public_keys_to_addresses(chunk)]
+
+    with Pool(cores) as pool:
+        return [address for chunk in pool.imap(_public_keys_to_addresses, chunks)
+                for address in chunk]
+
+
 def public_key_to_coords(public_key):
 
     length = len(public_key)
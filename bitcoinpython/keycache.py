@@ -0,0 +1,94 @@
+import sqlite3
+from collections import namedtuple
+from threading import Lock
+
+from bitcoinpython.base58 import b58encode_check
+from bitcoinpython.crypto import ripemd160_sha256
+from bitcoinpython.format import MAIN_PUBKEY_HASH, hash160_to_cashaddr
+from bitcoinpython.transaction import (
+    OP_CHECKSIG, OP_DUP, OP_EQUALVERIFY, OP_HASH160, OP_PUSH_20
+)
+
+Derivation = namedtuple('Derivation', ('hash160', 'address', 'legacy_address', 'scriptcode'))
+
+DERIVATION_CACHE = None
+
+
+def hash160_to_scriptcode(hash160):
+    return OP_DUP + OP_HASH160 + OP_PUSH_20 + hash160 + OP_EQUALVERIFY + OP_CHECKSIG
+
+
+def derive(public_key):
+    """Computes everything derived from a public key's hash on mainnet."""
+    hash160 = ripemd160_sha256(public_key)
+    return Derivation(
+        hash160,
+        hash160_to_cashaddr(hash160),
+        b58encode_check(MAIN_PUBKEY_HASH + hash160),
+        hash160_to_scriptcode(hash160)
+    )
+
+
+class DerivationCache:
+    """Persists :class:`Derivation` records in sqlite, keyed by public key,
+    so known keys skip hashing and address encoding after a restart.
+
+    :param path: The database file. By default the cache only lives in memory.
+    :type path: ``str``
+    """
+
+    def __init__(self, path=':memory:'):
+        self._lock = Lock()
+        self._memory = {}
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS derivations ('
+            'public_key BLOB PRIMARY KEY, hash160 BLOB NOT NULL, address TEXT NOT NULL, '
+            'legacy_address TEXT NOT NULL, scriptcode BLOB NOT NULL)'
+        )
+        self._db.commit()
+
+    def get(self, public_key):
+        """:rtype: :class:`Derivation`"""
+        derivation = self._memory.get(public_key)
+        if derivation is not None:
+            return derivation
+
+        with self._lock:
+            row = self._db.execute(
+                'SELECT hash160, address, legacy_address, scriptcode FROM derivations '
+                'WHERE public_key = ?', (public_key,)
+            ).fetchone()
+
+            if row is None:
+                derivation = derive(public_key)
+                self._db.execute(
+                    'INSERT OR REPLACE INTO derivations VALUES (?, ?, ?, ?, ?)',
+                    (public_key,) + derivation
+                )
+                self._db.commit()
+            else:
+                derivation = Derivation(*row)
+
+        self._memory[public_key] = derivation
+        return derivation
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute('SELECT COUNT(*) FROM derivations').fetchone()[0]
+
+
+def set_derivation_cache(path):
+    """Makes :class:`~bitcoinpython.PrivateKey` look up its address and
+    scriptcode in a persistent cache at ``path``. ``None`` disables it.
+    """
+    global DERIVATION_CACHE
+
+    if DERIVATION_CACHE is not None:
+        DERIVATION_CACHE.close()
+
+    DERIVATION_CACHE = None if path is None else DerivationCache(path)
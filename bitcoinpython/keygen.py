@@ -1,12 +1,25 @@
+import math
 import sys
 import time
-from multiprocessing import Event, Process, Queue, Value, cpu_count
+from multiprocessing import Array, Event, Process, Queue
 
 from coincurve import Context
 
-from bitcoinpython.base58 import BASE58_ALPHABET, b58encode_check
-from bitcoinpython.crypto import ECPrivateKey, ripemd160_sha256
-from bitcoinpython.format import bytes_to_wif, public_key_to_address
+from bitcoinpython.base58 import BASE58_ALPHABET, BASE58_ALPHABET_INDEX, b58encode_check
+from bitcoinpython.crypto import ECPrivateKey, ECPublicKey, ripemd160_sha256
+from bitcoinpython.curve import GROUP_ORDER
+from bitcoinpython.format import (
+    CASHADDR_CHARSET, CASHADDR_MAIN_PREFIX, MAIN_PUBKEY_HASH, bytes_to_wif,
+    hash160_to_cashaddr, public_key_to_address
+)
+from bitcoinpython.utils import get_core_count
+
+# Workers only update their shared counter once per this many keys.
+COUNTER_BATCH_SIZE = 1000
+
+# Seconds to wait for a worker to notice the search is over before
+# terminating it.
+WORKER_JOIN_TIMEOUT = 5
 
 
 def generate_key_address_pair():  # pragma: no cover
@@ -15,79 +28,329 @@ def generate_key_address_pair():  # pragma: no cover
     return bytes_to_wif(private_key.secret), address
 
 
-def generate_matching_address(prefix, cores='all'):  # pragma: no cover
+def prefix_to_hash160_ranges(prefix):
+    """Turns a legacy P2PKH address prefix into the inclusive ranges of
+    hash160 values, as ints, whose address may start with it. Any hash160
+    outside of these cannot match, so only the few inside need encoding.
+
+    :param prefix: The address prefix, including the leading ``1``.
+    :type prefix: ``str``
+    :rtype: ``list`` of ``tuple``
+    """
+    rest = prefix.lstrip('1')
+    # Every '1' after the version byte's is a leading zero byte of the hash.
+    zeros = len(prefix) - len(rest) - 1
+
+    if zeros > 20:
+        return []
+    elif not rest:
+        return [(0, (1 << (8 * (20 - zeros))) - 1)]
+
+    value = 0
+    for char in rest:
+        value = value * 58 + BASE58_ALPHABET_INDEX[char]
+
+    # The encoded number is the hash160 followed by a 4 byte checksum,
+    # having exactly `zeros` leading zero bytes.
+    lower = 256 ** (23 - zeros)
+    upper = 256 ** (24 - zeros)
+
+    ranges = []
+    for length in range(len(rest), 34):
+        scale = 58 ** (length - len(rest))
+        low = max(value * scale, lower)
+        high = min((value + 1) * scale, upper)
+        if low < high:
+            ranges.append((low >> 32, (high - 1) >> 32))
 
+    return ranges
+
+
+def cashaddr_prefix_to_hash160_ranges(prefix):
+    """Turns a P2PKH cash address payload prefix, such as ``qq4pf``, into
+    the range of hash160 values, as ints, whose address starts with it.
+    Each character fixes 5 bits of the version byte followed by the hash,
+    so this is a bit mask over the top of the hash160.
+
+    :param prefix: The payload prefix, without ``bitcoincash:``.
+    :type prefix: ``str``
+    :rtype: ``list`` of ``tuple``
+    """
+    value = 0
     for char in prefix:
-        if char not in BASE58_ALPHABET:
-            raise ValueError('{} is an invalid base58 encoded '
-                             'character.'.format(char))
+        value = (value << 5) | CASHADDR_CHARSET.index(char)
+
+    # 8 version bits, 160 hash bits and 2 padding bits.
+    bits = 5 * len(prefix)
+    if bits > 170:
+        return []
+    value <<= 170 - bits
+
+    # Only a zero version byte (P2PKH) and zero padding are valid.
+    if value >> 162 or value & 0b11:
+        return []
+
+    mask = (1 << (170 - bits)) - 1
+    low = value >> 2
+    # Short prefixes leave version bits unset, which must stay zero.
+    high = min((value | mask) >> 2, (1 << 160) - 1)
+    return [(low, high)]
 
-    if not prefix:
-        return generate_key_address_pair()
-    elif not prefix.startswith('1'):
-        prefix = '1' + prefix
 
-    available_cores = cpu_count()
+def _hash160_to_legacy_address(hash160):
+    return b58encode_check(MAIN_PUBKEY_HASH + hash160)
+
+
+def _search_ranges(prefix, address_format):
+
+    if address_format == 'cashaddr':
+        prefix = prefix.lower()
+        if prefix.startswith(CASHADDR_MAIN_PREFIX + ':'):
+            prefix = prefix[len(CASHADDR_MAIN_PREFIX) + 1:]
+
+        for char in prefix:
+            if char not in CASHADDR_CHARSET:
+                raise ValueError('{} is an invalid cashaddr encoded '
+                                 'character.'.format(char))
+
+        if not prefix.startswith('q'):
+            prefix = 'q' + prefix
+        ranges = cashaddr_prefix_to_hash160_ranges(prefix)
+
+    elif address_format == 'legacy':
+        for char in prefix:
+            if char not in BASE58_ALPHABET:
+                raise ValueError('{} is an invalid base58 encoded '
+                                 'character.'.format(char))
+
+        if not prefix.startswith('1'):
+            prefix = '1' + prefix
+        ranges = prefix_to_hash160_ranges(prefix)
 
-    if cores == 'all':
-        cores = available_cores
-    elif 0 < int(cores) <= available_cores:
-        cores = int(cores)
     else:
-        cores = 1
+        raise ValueError('Unknown address format {}.'.format(address_format))
+
+    if not ranges:
+        raise ValueError('No address can start with {}.'.format(prefix))
+
+    return prefix, ranges
+
+
+class KeygenProgress:
+    """A snapshot of a running address search.
+
+    Attempts are modelled as independent trials, each matching with
+    probability ``1 / expected_attempts``, so the chance of success so far
+    is ``1 - (1 - p) ** attempts`` and the remaining time is independent of
+    the time already spent.
+    """
+    __slots__ = ('prefix', 'elapsed', 'attempts', 'worker_rates', 'expected_attempts',
+                 'wif', 'address')
+
+    SUCCESS_QUANTILES = (0.5, 0.9, 0.99)
 
-    counter = Value('i')
+    def __init__(self, prefix, elapsed, attempts, worker_rates, expected_attempts,
+                 wif=None, address=None):
+        self.prefix = prefix
+        self.elapsed = elapsed
+        self.attempts = attempts
+        self.worker_rates = worker_rates
+        self.expected_attempts = expected_attempts
+        self.wif = wif
+        self.address = address
+
+    @property
+    def rate(self):
+        """Keys checked per second by all workers."""
+        return sum(self.worker_rates)
+
+    @property
+    def probability(self):
+        """The probability a match would have been found by now."""
+        if self.expected_attempts <= 1:
+            # Every key matches.
+            return 1.0 if self.attempts else 0.0
+        return -math.expm1(self.attempts * math.log1p(-1 / self.expected_attempts))
+
+    @property
+    def eta(self):
+        """The expected number of seconds until a match, or ``None`` before
+        the rate is known."""
+        if not self.rate:
+            return None
+        return self.expected_attempts / self.rate
+
+    def seconds_to_probability(self, probability):
+        """The number of seconds from now within which a match is found with
+        the given probability, or ``None`` before the rate is known."""
+        if not self.rate:
+            return None
+        if self.expected_attempts <= 1:
+            return 1 / self.rate
+        attempts = math.log1p(-probability) / math.log1p(-1 / self.expected_attempts)
+        return attempts / self.rate
+
+    def to_dict(self):
+        return {
+            'prefix': self.prefix,
+            'elapsed': self.elapsed,
+            'attempts': self.attempts,
+            'rate': self.rate,
+            'worker_rates': self.worker_rates,
+            'expected_attempts': self.expected_attempts,
+            'probability': self.probability,
+            'eta': self.eta,
+            'success_curve': {
+                str(quantile): self.seconds_to_probability(quantile)
+                for quantile in self.SUCCESS_QUANTILES
+            },
+            'wif': self.wif,
+            'address': self.address,
+        }
+
+    def __repr__(self):
+        return 'KeygenProgress(attempts={}, rate={:.0f}, probability={:.4f})'.format(
+            self.attempts, self.rate, self.probability
+        )
+
+
+def search_matching_address(prefix, cores='all', address_format='legacy', interval=1):  # pragma: no cover
+    """Searches for an address starting with ``prefix`` and yields a
+    :class:`KeygenProgress` every ``interval`` seconds. The last one yielded
+    has its ``wif`` and ``address`` set.
+
+    :param prefix: The address prefix.
+    :type prefix: ``str``
+    :param cores: The number of worker processes, or ``'all'``.
+    :type cores: ``int`` or ``str``
+    :param address_format: ``'legacy'`` or ``'cashaddr'``.
+    :type address_format: ``str``
+    :param interval: Seconds between progress reports.
+    :type interval: ``float``
+    """
+    prefix, ranges = _search_ranges(prefix, address_format)
+    expected_attempts = (1 << 160) / sum(high - low + 1 for low, high in ranges)
+
+    cores = get_core_count(cores)
+
+    counters = Array('Q', cores, lock=False)
     match = Event()
     queue = Queue()
 
     workers = []
-    for _ in range(cores):
+    for index in range(cores):
         workers.append(
             Process(
                 target=generate_key_address_pairs,
-                args=(prefix, counter, match, queue)
+                args=(prefix, counters, index, match, queue, address_format)
             )
         )
 
-    for worker in workers:
-        worker.start()
+    try:
+        for worker in workers:
+            worker.start()
+
+        start = last_time = time.monotonic()
+        last_counts = [0] * cores
+
+        def snapshot(now):
+            counts = counters[:]
+            worker_rates = [
+                (count - last) / (now - last_time) if now > last_time else 0.0
+                for count, last in zip(counts, last_counts)
+            ]
+            return counts, KeygenProgress(prefix, now - start, sum(counts), worker_rates,
+                                          expected_attempts)
 
-    keys_generated = 0
-    while True:
-        time.sleep(1)
-        current = counter.value
-        if current == keys_generated:
-            if current == 0:
+        while not match.wait(interval):
+            now = time.monotonic()
+            last_counts, progress = snapshot(now)
+            last_time = now
+            yield progress
+
+        private_key, address = queue.get()
+
+        _, progress = snapshot(time.monotonic())
+        progress.wif = bytes_to_wif(private_key, compressed=True)
+        progress.address = address
+        yield progress
+    finally:
+        # Also stops the search when the consumer stops iterating early.
+        match.set()
+        for worker in workers:
+            if worker.pid is None:
                 continue
-            break
-        keys_generated = current
-        s = 'Keys generated: {}\r'.format(keys_generated)
-        sys.stdout.write(s)
-        sys.stdout.flush()
+            worker.join(WORKER_JOIN_TIMEOUT)
+            if worker.is_alive():
+                worker.terminate()
+                worker.join()
+
+
+def generate_matching_address(prefix, cores='all', address_format='legacy',
+                              progress=None):  # pragma: no cover
+    """Searches for an address starting with ``prefix`` and prints it with
+    its WIF. ``progress``, if given, is called with every
+    :class:`KeygenProgress` instead of printing the number of keys generated.
+    """
+
+    if address_format == 'legacy' and not prefix:
+        return generate_key_address_pair()
+
+    for current in search_matching_address(prefix, cores, address_format):
+        if progress is not None:
+            progress(current)
+        else:
+            s = 'Keys generated: {}\r'.format(current.attempts)
+            sys.stdout.write(s)
+            sys.stdout.flush()
 
-    private_key, address = queue.get()
     print('\n\n'
           'WIF: {}\n'
-          'Address: {}'.format(bytes_to_wif(private_key), address))
+          'Address: {}'.format(current.wif, current.address))
 
 
-def generate_key_address_pairs(prefix, counter, match, queue):  # pragma: no cover
+def generate_key_address_pairs(prefix, counters, index, match, queue,
+                               address_format='legacy'):  # pragma: no cover
 
     context = Context()
 
-    while True:
-        if match.is_set():
-            return
+    if address_format == 'cashaddr':
+        ranges = cashaddr_prefix_to_hash160_ranges(prefix)
+        encode = hash160_to_cashaddr
+        prefix = CASHADDR_MAIN_PREFIX + ':' + prefix
+    else:
+        ranges = prefix_to_hash160_ranges(prefix)
+        encode = _hash160_to_legacy_address
 
-        with counter.get_lock():
-            counter.value += 1
+    generator = ECPrivateKey((1).to_bytes(32, 'big'), context=context).public_key
+    combine = ECPublicKey.combine_keys
 
-        private_key = ECPrivateKey(context=context)
-        address = b58encode_check(
-            b'\x00' + ripemd160_sha256(private_key.public_key.format())
-        )
+    # Walk k, k + 1, k + 2... from a random start so every step is a point
+    # addition rather than a full multiplication.
+    private_key = ECPrivateKey(context=context)
+    secret = private_key.to_int()
+    public_key = private_key.public_key
+
+    while not match.is_set():
+
+        for checked in range(COUNTER_BATCH_SIZE):
+            hash160 = ripemd160_sha256(public_key.format())
+            num = int.from_bytes(hash160, 'big')
+
+            for low, high in ranges:
+                if low <= num <= high:
+                    address = encode(hash160)
+                    if address.startswith(prefix):
+                        counters[index] += checked + 1
+                        match.set()
+                        queue.put_nowait((secret.to_bytes(32, 'big'), address))
+                        return
+
+            secret += 1
+            if secret == GROUP_ORDER:
+                secret = 1
+                public_key = generator
+            else:
+                public_key = combine([public_key, generator], context=context)
 
-        if address.startswith(prefix):
-            match.set()
-            queue.put_nowait((private_key.secret, address))
-            return
+        counters[index] += COUNTER_BATCH_SIZE
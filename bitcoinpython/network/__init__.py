@@ -3,8 +3,15 @@ from .rates import (
     currency_to_satoshi, currency_to_satoshi_cached,
     satoshi_to_currency, satoshi_to_currency_cached
 )
-from .services import NetworkAPI
+from .cache import LRUCache, ResponseCache, set_request_coalescing, set_response_cache
+from .txstore import TransactionStore, set_transaction_store
+from .services import LookupResults, NetworkAPI, get_provider_stats, reset_provider_stats
+from .aio import AsyncNetworkAPI
+from .watcher import AddressWatcher, WatchEvent
 
 
 __all__ = ['get_fee','currency_to_satoshi', 'currency_to_satoshi_cached',
-    'satoshi_to_currency', 'satoshi_to_currency_cached','NetworkAPI']
\ No newline at end of file
+    'satoshi_to_currency', 'satoshi_to_currency_cached','NetworkAPI',
+    'AsyncNetworkAPI', 'LookupResults', 'get_provider_stats', 'reset_provider_stats',
+    'LRUCache', 'ResponseCache', 'set_response_cache', 'set_request_coalescing',
+    'TransactionStore', 'set_transaction_store', 'AddressWatcher', 'WatchEvent']
\ No newline at end of file
@@ -0,0 +1,261 @@
+import asyncio
+import json
+import time
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+from bitcoinpython.network import services
+from bitcoinpython.network.services import (
+    PROVIDER_STATS, LookupResults, NetworkAPI, hedge_delay, rank_providers
+)
+
+# Requests in flight at once to any single provider.
+DEFAULT_CONCURRENCY = 10
+
+
+class AsyncNetworkAPI:
+    """The asyncio counterpart of :class:`~bitcoinpython.network.NetworkAPI`.
+    It tries the same providers in the same order and parses their answers
+    with the same code, but many lookups can run at once on one event loop.
+    Requires ``aiohttp``.
+
+    >>> async with AsyncNetworkAPI() as api:
+    ...     balances = await asyncio.gather(*map(api.get_balance, addresses))
+
+    :param concurrency: The number of requests in flight at once per provider.
+    :type concurrency: ``int``
+    :param session: An ``aiohttp.ClientSession`` to use. By default one is
+                    opened on entering the context and closed on leaving it.
+    """
+    IGNORED_ERRORS = (
+        (aiohttp.ClientError, asyncio.TimeoutError, json.JSONDecodeError)
+        if aiohttp is not None else ()
+    )
+
+    network_api = NetworkAPI
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, session=None):
+        if aiohttp is None:
+            raise ImportError('AsyncNetworkAPI requires aiohttp.')
+
+        self.concurrency = concurrency
+        self._session = session
+        self._owns_session = session is None
+        self._semaphores = {}
+
+    async def __aenter__(self):
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _semaphore(self, provider):
+        semaphore = self._semaphores.get(provider)
+        if semaphore is None:
+            semaphore = self._semaphores[provider] = asyncio.Semaphore(self.concurrency)
+        return semaphore
+
+    async def fetch(self, provider, request):
+        """Answers a :class:`~bitcoinpython.network.services.Request` of
+        ``provider``.
+        """
+        headers = {
+            name: value for name, value in (request.headers or {}).items()
+            if value is not None
+        }
+
+        async with self._semaphore(provider):
+            async with self._session.request(
+                request.method, request.url, json=request.payload, headers=headers,
+                timeout=aiohttp.ClientTimeout(total=request.timeout)
+            ) as r:
+                if request.status_only:
+                    return r.status
+
+                r.raise_for_status()
+                return json.loads(await r.text(), parse_float=request.parse_float)
+
+    async def call(self, api_call, *args):
+        """Runs a provider :class:`~bitcoinpython.network.services.Endpoint`."""
+        steps = api_call.steps(*args)
+
+        try:
+            request = next(steps)
+            while True:
+                request = steps.send(await self.fetch(api_call.provider, request))
+        except StopIteration as e:
+            return e.value
+
+    async def _timed_call(self, api_call, *args):
+        start = time.monotonic()
+        try:
+            result = await self.call(api_call, *args)
+        except Exception:
+            PROVIDER_STATS.record_failure(api_call)
+            raise
+        PROVIDER_STATS.record_success(api_call, time.monotonic() - start)
+        return result
+
+    async def _first_answer(self, api_calls, *args):
+
+        api_calls = rank_providers(api_calls)
+
+        if services.HEDGE_REQUESTS:
+            return await self._hedged_answer(api_calls, *args)
+
+        for api_call in api_calls:
+            try:
+                return await self._timed_call(api_call, *args)
+            except self.IGNORED_ERRORS:
+                pass
+
+        raise ConnectionError('All APIs are unreachable.')
+
+    async def _batch_answer(self, api_calls, addresses):
+        try:
+            return await self._first_answer(api_calls, addresses)
+        except ConnectionError:
+            return {}
+
+    async def _lookup_many(self, batch_calls, single_call, addresses):
+        addresses = list(dict.fromkeys(addresses))
+        results = {}
+
+        if batch_calls:
+            limit = services.MULTI_ADDRESS_LIMIT
+            answers = await asyncio.gather(*(
+                self._batch_answer(batch_calls, addresses[i:i + limit])
+                for i in range(0, len(addresses), limit)
+            ))
+            for answer in answers:
+                results.update(answer)
+
+        missing = [address for address in addresses if address not in results]
+        answers = await asyncio.gather(*map(single_call, missing), return_exceptions=True)
+        failed = []
+        for address, answer in zip(missing, answers):
+            if isinstance(answer, ConnectionError):
+                failed.append(address)
+            elif isinstance(answer, BaseException):
+                raise answer
+            else:
+                results[address] = answer
+
+        if failed and not results:
+            raise ConnectionError('All APIs are unreachable.')
+
+        return LookupResults(
+            ((address, results[address]) for address in addresses if address in results),
+            failed=failed
+        )
+
+    async def _hedged_answer(self, api_calls, *args):
+        """Like :meth:`NetworkAPI._hedged_answer
+        <bitcoinpython.network.NetworkAPI._hedged_answer>`, except that the
+        slower requests are cancelled once an answer arrives.
+        """
+        remaining = list(api_calls)
+        pending = set()
+        delay = None
+
+        try:
+            while pending or remaining:
+                if remaining and (not pending or delay is not None):
+                    api_call = remaining.pop(0)
+                    pending.add(asyncio.ensure_future(self._timed_call(api_call, *args)))
+                    delay = hedge_delay(api_call) if remaining else None
+
+                done, pending = await asyncio.wait(
+                    pending, timeout=delay, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                for task in done:
+                    try:
+                        return task.result()
+                    except self.IGNORED_ERRORS:
+                        delay = 0 if remaining else None
+        finally:
+            for task in pending:
+                task.cancel()
+
+        raise ConnectionError('All APIs are unreachable.')
+
+    async def get_balance(self, address):
+        """See :meth:`NetworkAPI.get_balance <bitcoinpython.network.NetworkAPI.get_balance>`."""
+        return await self._first_answer(self.network_api.GET_BALANCE_MAIN, address)
+
+    async def get_balance_btc(self, address):
+        return await self._first_answer(self.network_api.GET_BALANCE_MAIN_BTC, address)
+
+    async def get_transactions(self, txs):
+        return await self._first_answer(self.network_api.GET_TRANSACTIONS_MAIN, txs)
+
+    async def get_transactions_by_address(self, address, x_api_key=None):
+        return await self._first_answer(self.network_api.GET_TXS_BY_ADDRESS_MAIN, address, x_api_key)
+
+    async def get_transactions_btc(self, address):
+        return await self._first_answer(self.network_api.GET_TRANSACTIONS_MAIN_BTC, address)
+
+    async def get_transaction(self, txid, x_api_key=None):
+        return await self._first_answer(self.network_api.GET_TX_MAIN, txid, x_api_key)
+
+    async def get_transaction_btc(self, txid, x_api_key=None):
+        return await self._first_answer(self.network_api.GET_TRANSACTION_MAIN_BTC, txid, x_api_key)
+
+    async def get_tx_amount(self, txid, txindex):
+        return await self._first_answer(self.network_api.GET_TX_AMOUNT_MAIN, txid, txindex)
+
+    async def get_unspent(self, address):
+        """See :meth:`NetworkAPI.get_unspent <bitcoinpython.network.NetworkAPI.get_unspent>`."""
+        return await self._first_answer(self.network_api.GET_UNSPENT_MAIN, address)
+
+    async def get_unspent_btc(self, address):
+        return await self._first_answer(self.network_api.GET_UNSPENT_MAIN_BTC, address)
+
+    async def get_raw_transaction(self, txid):
+        return await self._first_answer(self.network_api.GET_RAW_TX_MAIN, txid)
+
+    async def get_balance_many(self, addresses):
+        """See :meth:`NetworkAPI.get_balance_many <bitcoinpython.network.NetworkAPI.get_balance_many>`."""
+        return await self._lookup_many(self.network_api.GET_BALANCE_MANY_MAIN,
+                                       self.get_balance, addresses)
+
+    async def get_unspent_many(self, addresses):
+        """See :meth:`NetworkAPI.get_unspent_many <bitcoinpython.network.NetworkAPI.get_unspent_many>`."""
+        return await self._lookup_many(self.network_api.GET_UNSPENT_MANY_MAIN,
+                                       self.get_unspent, addresses)
+
+    async def get_block_number(self, x_api_key=None):
+        return await self._first_answer(self.network_api.GET_BLOCK_NUMBER, x_api_key)
+
+    async def get_block_number_btc(self, x_api_key=None):
+        return await self._first_answer(self.network_api.GET_BLOCK_NUMBER_BTC, x_api_key)
+
+    async def broadcast_tx(self, tx_hex, x_api_key=None):  # pragma: no cover
+        """See :meth:`NetworkAPI.broadcast_tx <bitcoinpython.network.NetworkAPI.broadcast_tx>`."""
+        success = None
+
+        for api_call in self.network_api.BROADCAST_TX_MAIN:
+            try:
+                success = await self.call(api_call, tx_hex, x_api_key)
+                if not success:
+                    continue
+                return
+            except self.IGNORED_ERRORS:
+                pass
+
+        if success is False:
+            raise ConnectionError('Transaction broadcast failed, or '
+                                  'Unspents were already used.')
+
+        raise ConnectionError('All APIs are unreachable.')
@@ -0,0 +1,170 @@
+from collections import OrderedDict
+from concurrent.futures import Future
+from copy import deepcopy
+from functools import wraps
+from threading import Lock
+from time import monotonic
+
+# Entries kept by the default cache before the least recently used is
+# evicted, and how long in seconds answers that can still change are kept.
+# Confirmed transactions never change, so they are kept until evicted.
+DEFAULT_CACHE_SIZE = 1024
+MEMPOOL_TTL = 10
+UNSPENT_TTL = 10
+BLOCK_NUMBER_TTL = 30
+FOREVER = None
+
+
+class ResponseCache:
+    """The interface of a network response cache. Subclass it to keep
+    responses elsewhere, e.g. in a shared store, and install it with
+    :func:`set_response_cache`.
+    """
+
+    def get(self, key):
+        """Returns the cached value, or raises ``KeyError`` if there is none
+        or it has expired."""
+        raise NotImplementedError
+
+    def set(self, key, value, ttl=FOREVER):
+        """Caches ``value`` for ``ttl`` seconds, or until evicted if ``None``."""
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class LRUCache(ResponseCache):
+    """An in-memory cache holding at most ``maxsize`` entries, evicting the
+    least recently used one first.
+
+    :param maxsize: The maximum number of entries.
+    :type maxsize: ``int``
+    """
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key):
+        with self._lock:
+            value, expires = self._entries[key]
+            if expires is not None and expires <= monotonic():
+                del self._entries[key]
+                raise KeyError(key)
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=FOREVER):
+        expires = None if ttl is None else monotonic() + ttl
+
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+RESPONSE_CACHE = LRUCache()
+REQUEST_COALESCING = True
+
+# Bumped whenever our own actions may have changed mutable answers, such
+# as unspents after a broadcast, so entries cached before are skipped.
+_generation = 0
+
+_in_flight = {}
+_in_flight_lock = Lock()
+
+
+def set_response_cache(cache):
+    """Installs the cache used for network lookups. ``None`` disables it.
+
+    :param cache: The cache to use.
+    :type cache: :class:`ResponseCache`
+    """
+    global RESPONSE_CACHE
+    RESPONSE_CACHE = cache
+
+
+def set_request_coalescing(enabled):
+    """Whether identical lookups running at once share a single request."""
+    global REQUEST_COALESCING
+    REQUEST_COALESCING = enabled
+
+
+def invalidate_mutable():
+    """Makes every cached answer that may still change stale."""
+    global _generation
+    _generation += 1
+
+
+def _coalesced(key, func, *args, **kwargs):
+    with _in_flight_lock:
+        flight = _in_flight.get(key)
+        leader = flight is None
+        if leader:
+            flight = _in_flight[key] = Future()
+
+    if not leader:
+        # The leader's caller owns the result.
+        return deepcopy(flight.result())
+
+    try:
+        result = func(*args, **kwargs)
+    except BaseException as e:
+        flight.set_exception(e)
+        raise
+    else:
+        flight.set_result(result)
+        return result
+    finally:
+        with _in_flight_lock:
+            del _in_flight[key]
+
+
+def cached(ttl, mutable=True):
+    """Caches the answers of a network lookup, keyed by its name and
+    arguments. Every caller gets its own copy of an answer, so mutating one
+    never changes what other callers get.
+
+    :param ttl: Seconds to keep an answer, ``None`` to keep it until evicted,
+                or a function of the answer returning either.
+    :param mutable: Whether the answer may change through our own actions,
+                    see :func:`invalidate_mutable`.
+    """
+    def decorator(func):
+
+        @wraps(func)
+        def wrapper(cls, *args, **kwargs):
+            key = (func.__name__, _generation if mutable else 0) + args
+            if kwargs:
+                key += tuple(sorted(kwargs.items()))
+            cache = RESPONSE_CACHE
+
+            if cache is not None:
+                try:
+                    return deepcopy(cache.get(key))
+                except KeyError:
+                    pass
+
+            if REQUEST_COALESCING:
+                result = _coalesced(key, func, cls, *args, **kwargs)
+            else:
+                result = func(cls, *args, **kwargs)
+
+            if cache is not None:
+                cache.set(key, deepcopy(result), ttl(result) if callable(ttl) else ttl)
+
+            return result
+
+        return wrapper
+
+    return decorator
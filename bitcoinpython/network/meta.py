@@ -1,3 +1,6 @@
+from bisect import bisect_left, insort
+from threading import RLock
+
 TX_TRUST_LOW = 1
 TX_TRUST_MEDIUM = 6
 TX_TRUST_HIGH = 30
@@ -34,4 +37,143 @@ class Unspent:
             repr(self.script),
             repr(self.txid),
             repr(self.txindex)
-        )
\ No newline at end of file
+        )
+
+class UnspentIndex:
+    """Indexes unspents by ``(txid, txindex)`` and by amount, and tracks the
+    ones reserved by transactions being built or broadcast so that they are
+    never handed out twice. Hold :attr:`lock` to select and reserve unspents
+    in one step.
+
+    Unspents marked spent stay excluded from :meth:`update` for as long as
+    the fetched unspents still include them, as providers may report a
+    spent output until they see the spending transaction.
+
+    :param unspents: The initial unspents.
+    :type unspents: iterable of :class:`Unspent`
+    """
+
+    def __init__(self, unspents=()):
+        self.lock = RLock()
+        self._unspents = {}
+        self._by_amount = []
+        self._reserved = set()
+        self._spent = set()
+        self.update(unspents)
+
+    @staticmethod
+    def _sort_key(key, unspent):
+        return unspent.amount, key
+
+    def get(self, txid, txindex):
+        """:rtype: :class:`Unspent` or ``None``"""
+        return self._unspents.get((txid, txindex))
+
+    def add(self, unspent):
+        key = (unspent.txid, unspent.txindex)
+
+        with self.lock:
+            if key in self._unspents or key in self._spent:
+                return
+            self._unspents[key] = unspent
+            insort(self._by_amount, self._sort_key(key, unspent))
+
+    def discard(self, txid, txindex):
+        key = (txid, txindex)
+
+        with self.lock:
+            unspent = self._unspents.pop(key, None)
+            if unspent is None:
+                return
+            del self._by_amount[bisect_left(self._by_amount, self._sort_key(key, unspent))]
+            self._reserved.discard(key)
+
+    def update(self, unspents, fetched=True):
+        """Replaces the indexed unspents, e.g. after fetching them again.
+        Reservations of unspents still present are kept, and unspents marked
+        spent are left out until they are no longer fetched.
+
+        :param unspents: The unspents.
+        :type unspents: iterable of :class:`Unspent`
+        :param fetched: Whether ``unspents`` were just fetched from the
+                        network. Only then are spent unspents missing from
+                        them forgotten, as any other list may already have
+                        had them filtered out.
+        :type fetched: ``bool``
+        """
+        unspents = {(unspent.txid, unspent.txindex): unspent for unspent in unspents}
+
+        with self.lock:
+            if fetched:
+                self._spent &= unspents.keys()
+            for key in self._spent:
+                unspents.pop(key, None)
+
+            if unspents.keys() == self._unspents.keys():
+                return
+            self._unspents = unspents
+            self._by_amount = sorted(self._sort_key(key, unspent) for key, unspent in unspents.items())
+            self._reserved &= unspents.keys()
+
+    def available(self):
+        """The unspents not reserved, in the order they were added.
+
+        :rtype: ``list`` of :class:`Unspent`
+        """
+        with self.lock:
+            return [unspent for key, unspent in self._unspents.items() if key not in self._reserved]
+
+    def by_amount(self, reverse=False):
+        """The unspents not reserved, smallest first.
+
+        :rtype: ``list`` of :class:`Unspent`
+        """
+        with self.lock:
+            entries = reversed(self._by_amount) if reverse else self._by_amount
+            return [self._unspents[key] for _, key in entries if key not in self._reserved]
+
+    def reserve(self, unspents):
+        """Marks unspents as taken by a transaction.
+
+        :raises ValueError: If any of them is unknown or already reserved.
+        """
+        keys = [(unspent.txid, unspent.txindex) for unspent in unspents]
+
+        with self.lock:
+            for key in keys:
+                if key not in self._unspents:
+                    raise ValueError('Unspent {}:{} is not indexed.'.format(*key))
+                if key in self._reserved:
+                    raise ValueError('Unspent {}:{} is already reserved.'.format(*key))
+            self._reserved.update(keys)
+
+    def release(self, unspents):
+        """Makes reserved unspents available again, e.g. when a transaction
+        is dropped before being broadcast."""
+        with self.lock:
+            self._reserved.difference_update(
+                (unspent.txid, unspent.txindex) for unspent in unspents
+            )
+
+    def mark_spent(self, unspents):
+        """Removes unspents spent by a broadcast transaction, and keeps them
+        out when fetched again before the spend is seen."""
+        with self.lock:
+            for unspent in unspents:
+                self.discard(unspent.txid, unspent.txindex)
+                self._spent.add((unspent.txid, unspent.txindex))
+
+    def is_reserved(self, unspent):
+        return (unspent.txid, unspent.txindex) in self._reserved
+
+    def is_spent(self, unspent):
+        return (unspent.txid, unspent.txindex) in self._spent
+
+    def __contains__(self, unspent):
+        return (unspent.txid, unspent.txindex) in self._unspents
+
+    def __iter__(self):
+        return iter(list(self._unspents.values()))
+
+    def __len__(self):
+        return len(self._unspents)
@@ -1,15 +1,61 @@
 import logging
+import time
+from collections import deque, namedtuple
+from itertools import repeat
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from threading import Lock
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from cashaddress import convert as cashaddress
 from decimal import Decimal
 
-from bitcoinpython.network import currency_to_satoshi
+from bitcoinpython.network import currency_to_satoshi, txstore
+from bitcoinpython.network.cache import (
+    BLOCK_NUMBER_TTL, FOREVER, MEMPOOL_TTL, UNSPENT_TTL, cached, invalidate_mutable
+)
 from bitcoinpython.network.meta import Unspent
 from bitcoinpython.network.transaction import Transaction, TxPart
 
 DEFAULT_TIMEOUT = 30
 
+# Connections kept open per provider, retries of failed connections and
+# 5xx responses on idempotent requests, and whether to reuse connections.
+DEFAULT_POOL_SIZE = 10
+DEFAULT_RETRIES = 2
+DEFAULT_KEEP_ALIVE = True
+RETRY_BACKOFF = 0.1
+RETRY_STATUSES = (500, 502, 503, 504)
+
+# With hedging enabled, once a provider has taken longer than the
+# HEDGE_PERCENTILE of its recent latencies the next provider is asked in
+# parallel and the first valid answer wins. Until an endpoint has
+# HEDGE_MIN_SAMPLES latencies, HEDGE_DEFAULT_DELAY seconds are used.
+HEDGE_REQUESTS = False
+HEDGE_PERCENTILE = 95
+HEDGE_DEFAULT_DELAY = 1
+HEDGE_MIN_SAMPLES = 10
+HEDGE_WORKERS = 16
+LATENCY_WINDOW = 100
+
+# Providers are tried fastest first, ranked by moving averages of their
+# latency and error rate, where EWMA_ALPHA is the weight of the newest call.
+# An endpoint failing CIRCUIT_BREAKER_FAILURES times in a row is moved to
+# the back for CIRCUIT_BREAKER_COOLDOWN seconds.
+ADAPTIVE_ORDERING = True
+EWMA_ALPHA = 0.2
+CIRCUIT_BREAKER_FAILURES = 5
+CIRCUIT_BREAKER_COOLDOWN = 60
+
+# Addresses per request to native multi-address endpoints, and lookups in
+# flight at once when a provider has none and addresses are fanned out.
+MULTI_ADDRESS_LIMIT = 20
+FAN_OUT_WORKERS = 8
+
+# Transactions per page when walking an address history.
+TRANSACTION_PAGE_SIZE = 100
+
 BCH_TO_SAT_MULTIPLIER = 100000000
 
 
@@ -18,7 +64,413 @@ def set_service_timeout(seconds):
     DEFAULT_TIMEOUT = seconds
 
 
-class InsightAPI:
+def set_hedging(enabled=True, percentile=None, default_delay=None):
+    """Turns hedged requests across providers on or off.
+
+    :param enabled: Whether to hedge.
+    :type enabled: ``bool``
+    :param percentile: The latency percentile of a provider after which the
+                       next one is asked as well.
+    :type percentile: ``int``
+    :param default_delay: The delay in seconds used while a provider has too
+                          few recorded latencies.
+    :type default_delay: ``float``
+    """
+    global HEDGE_REQUESTS, HEDGE_PERCENTILE, HEDGE_DEFAULT_DELAY
+
+    HEDGE_REQUESTS = enabled
+    if percentile is not None:
+        HEDGE_PERCENTILE = percentile
+    if default_delay is not None:
+        HEDGE_DEFAULT_DELAY = default_delay
+
+
+def set_adaptive_ordering(enabled=True, failures=None, cooldown=None):
+    """Turns ranking providers by their recent latency and error rate on or
+    off. When off, they are always tried in the order they are listed in.
+
+    :param enabled: Whether to rank providers.
+    :type enabled: ``bool``
+    :param failures: The number of failures in a row that trip the circuit
+                     breaker of a provider endpoint.
+    :type failures: ``int``
+    :param cooldown: How long in seconds a tripped endpoint is tried last.
+    :type cooldown: ``float``
+    """
+    global ADAPTIVE_ORDERING, CIRCUIT_BREAKER_FAILURES, CIRCUIT_BREAKER_COOLDOWN
+
+    ADAPTIVE_ORDERING = enabled
+    if failures is not None:
+        CIRCUIT_BREAKER_FAILURES = failures
+    if cooldown is not None:
+        CIRCUIT_BREAKER_COOLDOWN = cooldown
+
+
+class LookupResults(dict):
+    """The answers of a lookup of many addresses, keyed by address.
+    Addresses no provider answered for are left out and listed in
+    :attr:`failed`.
+    """
+
+    def __init__(self, answers=(), failed=()):
+        super().__init__(answers)
+        self.failed = list(failed)
+
+
+class EndpointStats:
+    """The health of one provider endpoint."""
+    __slots__ = ('calls', 'failures', 'consecutive_failures', 'ewma_latency',
+                 'error_rate', 'open_until', 'latencies')
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.calls = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.ewma_latency = None
+        self.error_rate = 0.0
+        self.open_until = 0.0
+        self.latencies = deque(maxlen=window)
+
+    def score(self):
+        """The expected time to an answer, counting failed attempts. An
+        endpoint that never answered is assumed to take the whole timeout."""
+        latency = DEFAULT_TIMEOUT if self.ewma_latency is None else self.ewma_latency
+        return latency / max(1 - self.error_rate, 0.05) * (1 + self.consecutive_failures)
+
+    def to_dict(self, now):
+        return {
+            'calls': self.calls,
+            'failures': self.failures,
+            'consecutive_failures': self.consecutive_failures,
+            'ewma_latency': self.ewma_latency,
+            'error_rate': self.error_rate,
+            'circuit_open': self.open_until > now,
+        }
+
+
+class ProviderStats:
+    """Tracks the latency and error rate of every provider endpoint as
+    exponentially weighted moving averages, and trips a circuit breaker on
+    endpoints that keep failing.
+    """
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.window = window
+        self._stats = {}
+        self._lock = Lock()
+
+    def _get(self, api_call):
+        stats = self._stats.get(api_call)
+        if stats is None:
+            stats = self._stats[api_call] = EndpointStats(self.window)
+        return stats
+
+    def record_success(self, api_call, seconds):
+        with self._lock:
+            stats = self._get(api_call)
+            stats.calls += 1
+            stats.consecutive_failures = 0
+            stats.open_until = 0.0
+            stats.latencies.append(seconds)
+            stats.error_rate -= EWMA_ALPHA * stats.error_rate
+            if stats.ewma_latency is None:
+                stats.ewma_latency = seconds
+            else:
+                stats.ewma_latency += EWMA_ALPHA * (seconds - stats.ewma_latency)
+
+    def record_failure(self, api_call):
+        with self._lock:
+            stats = self._get(api_call)
+            stats.calls += 1
+            stats.failures += 1
+            stats.consecutive_failures += 1
+            stats.error_rate += EWMA_ALPHA * (1 - stats.error_rate)
+            if stats.consecutive_failures >= CIRCUIT_BREAKER_FAILURES:
+                stats.open_until = time.monotonic() + CIRCUIT_BREAKER_COOLDOWN
+
+    def percentile(self, api_call, percentile, min_samples=1):
+        """The given percentile of the recorded latencies in seconds, or
+        ``None`` with fewer than ``min_samples`` of them."""
+        with self._lock:
+            stats = self._stats.get(api_call)
+            latencies = sorted(stats.latencies) if stats is not None else []
+
+        if not latencies or len(latencies) < min_samples:
+            return None
+        return latencies[round(percentile / 100 * (len(latencies) - 1))]
+
+    def rank(self, api_calls):
+        """Orders ``api_calls`` fastest healthy endpoint first. Endpoints
+        never called keep their place so they get measured, and ones with an
+        open circuit go last, to be tried only when all others fail.
+        """
+        now = time.monotonic()
+
+        with self._lock:
+            scores = {}
+            tripped = []
+            for api_call in api_calls:
+                stats = self._stats.get(api_call)
+                if stats is not None:
+                    scores[api_call] = stats.score()
+                    if stats.open_until > now:
+                        tripped.append(api_call)
+
+        closed = [api_call for api_call in api_calls if api_call not in tripped]
+        # Measured endpoints are reordered among the places they hold.
+        measured = iter(sorted((api_call for api_call in closed if api_call in scores),
+                               key=scores.__getitem__))
+        ranked = [next(measured) if api_call in scores else api_call for api_call in closed]
+
+        return ranked + sorted(tripped, key=scores.__getitem__)
+
+    def to_dict(self):
+        """The stats of every endpoint called so far, keyed by
+        ``'Provider.endpoint'``.
+
+        :rtype: ``dict``
+        """
+        now = time.monotonic()
+
+        with self._lock:
+            return {
+                '{}.{}'.format(api_call.provider.__name__, api_call.__name__): stats.to_dict(now)
+                for api_call, stats in self._stats.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+PROVIDER_STATS = ProviderStats()
+
+
+def get_provider_stats():
+    """Returns the EWMA latency, error rate and circuit breaker state of
+    every provider endpoint used so far, keyed by ``'Provider.endpoint'``.
+
+    :rtype: ``dict``
+    """
+    return PROVIDER_STATS.to_dict()
+
+
+def reset_provider_stats():
+    PROVIDER_STATS.reset()
+
+
+def hedge_delay(api_call):
+    delay = PROVIDER_STATS.percentile(api_call, HEDGE_PERCENTILE, HEDGE_MIN_SAMPLES)
+    return HEDGE_DEFAULT_DELAY if delay is None else delay
+
+
+def rank_providers(api_calls):
+    if not ADAPTIVE_ORDERING:
+        return list(api_calls)
+    return PROVIDER_STATS.rank(api_calls)
+
+
+def timed_call(api_call, *args):
+    start = time.monotonic()
+    try:
+        result = api_call(*args)
+    except Exception:
+        PROVIDER_STATS.record_failure(api_call)
+        raise
+    PROVIDER_STATS.record_success(api_call, time.monotonic() - start)
+    return result
+
+
+def transaction_ttl(response):
+    """How long a transaction lookup may be cached: forever once the
+    transaction is confirmed, briefly while it is in the mempool."""
+    try:
+        if response.get('confirmations'):
+            return FOREVER
+        if response.get('blockNumber') is not None or response.get('blockheight', -1) > 0:
+            return FOREVER
+        # Blockchair dashboards, keyed by txid
+        for entry in (response.get('data') or {}).values():
+            if entry['transaction']['block_id'] != -1:
+                return FOREVER
+    except (AttributeError, KeyError, TypeError):
+        pass
+    return MEMPOOL_TTL
+
+
+def _raw_bytes(response):
+    try:
+        raw = response.get('hex')
+        if raw is None:
+            for entry in (response.get('data') or {}).values():
+                raw = entry.get('raw_transaction')
+        return None if raw is None else bytes.fromhex(raw)
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+_hedge_executor = None
+_hedge_executor_lock = Lock()
+
+
+def _get_hedge_executor():
+    global _hedge_executor
+
+    with _hedge_executor_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(HEDGE_WORKERS, thread_name_prefix='hedge')
+        return _hedge_executor
+
+
+_sessions = {}
+_sessions_lock = Lock()
+
+
+def set_session_options(pool_size=None, retries=None, keep_alive=None):
+    """Changes how the HTTP sessions of every provider are set up. Open
+    sessions are closed and recreated on their next use.
+
+    :param pool_size: The number of connections kept open per provider.
+    :type pool_size: ``int``
+    :param retries: How often a failed connection, or an idempotent request
+                    answered with a 5xx status, is retried.
+    :type retries: ``int``
+    :param keep_alive: Whether connections are reused between requests.
+    :type keep_alive: ``bool``
+    """
+    global DEFAULT_POOL_SIZE, DEFAULT_RETRIES, DEFAULT_KEEP_ALIVE
+
+    if pool_size is not None:
+        DEFAULT_POOL_SIZE = pool_size
+    if retries is not None:
+        DEFAULT_RETRIES = retries
+    if keep_alive is not None:
+        DEFAULT_KEEP_ALIVE = keep_alive
+
+    close_sessions()
+
+
+def close_sessions():
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+def _new_session():
+    # Read timeouts are not retried, the next provider is tried instead.
+    retries = Retry(total=DEFAULT_RETRIES, read=0, backoff_factor=RETRY_BACKOFF,
+                    status_forcelist=RETRY_STATUSES, raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=DEFAULT_POOL_SIZE,
+                          max_retries=retries)
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    if not DEFAULT_KEEP_ALIVE:
+        session.headers['Connection'] = 'close'
+
+    return session
+
+
+Request = namedtuple('Request', ('method', 'url', 'payload', 'headers', 'timeout',
+                                 'parse_float', 'status_only'))
+
+
+def json_request(url, method='GET', payload=None, headers=None, parse_float=None):
+    """A request whose decoded JSON body is sent back to the endpoint."""
+    return Request(method, url, payload, headers, DEFAULT_TIMEOUT, parse_float, False)
+
+
+def status_request(url, method='GET', payload=None, headers=None, timeout=None):
+    """A request whose status code is sent back to the endpoint."""
+    return Request(method, url, payload, headers, timeout, None, True)
+
+
+class endpoint:
+    """Declares a provider method written as a generator that yields every
+    :class:`Request` it needs answered and returns the parsed result. The
+    same parsing then serves blocking calls, answered through the provider's
+    session, and :class:`~bitcoinpython.network.aio.AsyncNetworkAPI`.
+    """
+
+    def __init__(self, func):
+        self.func = func
+
+    def __get__(self, instance, owner):
+        return Endpoint(owner, self.func)
+
+
+class Endpoint:
+    """An :class:`endpoint` bound to its provider. Calling it blocks until
+    the result is available.
+    """
+    __slots__ = ('provider', 'func')
+
+    def __init__(self, provider, func):
+        self.provider = provider
+        self.func = func
+
+    @property
+    def __name__(self):
+        return self.func.__name__
+
+    def steps(self, *args, **kwargs):
+        """The generator yielding this call's requests."""
+        return self.func(self.provider, *args, **kwargs)
+
+    def __call__(self, *args, **kwargs):
+        steps = self.steps(*args, **kwargs)
+        fetch = self.provider.fetch
+
+        try:
+            request = next(steps)
+            while True:
+                request = steps.send(fetch(request))
+        except StopIteration as e:
+            return e.value
+
+    def __eq__(self, other):
+        return (isinstance(other, Endpoint) and
+                self.provider is other.provider and
+                self.func is other.func)
+
+    def __hash__(self):
+        return hash((self.provider, self.func))
+
+    def __repr__(self):
+        return '<Endpoint: {}.{}>'.format(self.provider.__name__, self.__name__)
+
+
+class ServiceAPI:
+    """Gives every provider its own pooled ``requests.Session``, shared by
+    all threads, so repeated calls reuse open connections.
+    """
+
+    @classmethod
+    def session(cls):
+        session = _sessions.get(cls)
+        if session is None:
+            with _sessions_lock:
+                session = _sessions.get(cls)
+                if session is None:
+                    session = _sessions[cls] = _new_session()
+        return session
+
+    @classmethod
+    def fetch(cls, request):
+        r = cls.session().request(request.method, request.url, json=request.payload,
+                                  headers=request.headers, timeout=request.timeout)
+
+        if request.status_only:
+            return r.status_code
+
+        r.raise_for_status()
+        return r.json(parse_float=request.parse_float)
+
+
+class InsightAPI(ServiceAPI):
     MAIN_ENDPOINT = ''
     MAIN_ADDRESS_API = ''
     MAIN_BALANCE_API = ''
@@ -28,105 +480,123 @@ class InsightAPI:
     MAIN_TX_AMOUNT_API = ''
     TX_PUSH_PARAM = ''
 
-    @classmethod
+    @endpoint
     def get_tx_amount(cls, txid, txindex):
-        r = requests.get(cls.MAIN_TX_AMOUNT_API.format(
-            txid), timeout=DEFAULT_TIMEOUT)
-        r.raise_for_status()  # pragma: no cover
-        response = r.json(parse_float=Decimal)
+        response = yield json_request(cls.MAIN_TX_AMOUNT_API.format(txid), parse_float=Decimal)
         return (Decimal(response['vout'][txindex]['value']) * BCH_TO_SAT_MULTIPLIER).normalize()
 
-    @classmethod
+    @endpoint
     def broadcast_tx(cls, tx_hex, x_api_key=None):  # pragma: no cover
-        r = requests.post(cls.MAIN_TX_PUSH_API, json={
-                          cls.TX_PUSH_PARAM: tx_hex, 'network': 'mainnet', 'coin': 'BCH'}, timeout=DEFAULT_TIMEOUT)
-        print(r.status_code)
-        return True if r.status_code == 200 else False
+        status = yield status_request(cls.MAIN_TX_PUSH_API, method='POST', payload={
+            cls.TX_PUSH_PARAM: tx_hex, 'network': 'mainnet', 'coin': 'BCH'}, timeout=DEFAULT_TIMEOUT)
+        print(status)
+        return True if status == 200 else False
 
 
-class BitcoinDotComAPI():
+class BitcoinDotComAPI(ServiceAPI):
     """ rest.bitcoin.com API """
     MAIN_ENDPOINT = 'https://rest.bitcoin.com/v2/'
     MAIN_ADDRESS_API = MAIN_ENDPOINT + 'address/details/{}'
     MAIN_UNSPENT_API = MAIN_ENDPOINT + 'address/utxo/{}'
+    MAIN_ADDRESS_MANY_API = MAIN_ENDPOINT + 'address/details'
+    MAIN_UNSPENT_MANY_API = MAIN_ENDPOINT + 'address/utxo'
     MAIN_TX_PUSH_API = MAIN_ENDPOINT + 'rawtransactions/sendRawTransaction/{}'
     MAIN_TX_API = MAIN_ENDPOINT + 'transaction/details/{}'
     MAIN_TX_AMOUNT_API = MAIN_TX_API
     MAIN_RAW_API = MAIN_ENDPOINT + 'transaction/details/{}'
     TX_PUSH_PARAM = 'rawtx'
 
-    @classmethod
+    @endpoint
     def get_balance(cls, address):
-        r = requests.get(cls.MAIN_ADDRESS_API.format(address),
-                         timeout=DEFAULT_TIMEOUT)
-        r.raise_for_status()  # pragma: no cover
-        data = r.json()
+        data = yield json_request(cls.MAIN_ADDRESS_API.format(address))
         balance = data['balanceSat'] + data['unconfirmedBalanceSat']
         return balance
 
-    @classmethod
+    @endpoint
     def get_transactions(cls, address):
-        r = requests.get(cls.MAIN_ADDRESS_API.format(address),
-                         timeout=DEFAULT_TIMEOUT)
-        r.raise_for_status()  # pragma: no cover
+        data = yield json_request(cls.MAIN_ADDRESS_API.format(address))
         tnxs = []
-        n = 0
-        for i in r.json()['transactions']:
-            tnxs.append(cls.get_transaction(i))
-            n += 1
-            if n == 30:
-                break
+        for txid in data['transactions'][:30]:
+            tnxs.append((yield from cls.get_transaction.steps(txid)))
         return tnxs
 
-    @classmethod
+    @endpoint
     def get_transaction(cls, txid):
-        r = requests.get(cls.MAIN_TX_API.format(txid),
-                         timeout=DEFAULT_TIMEOUT)
-        r.raise_for_status()  # pragma: no cover
-        response = r.json()
+        response = yield json_request(cls.MAIN_TX_API.format(txid))
         return response
 
-    @classmethod
+    @endpoint
     def get_tx_amount(cls, txid, txindex):
-        r = requests.get(cls.MAIN_TX_AMOUNT_API.format(
-            txid), timeout=DEFAULT_TIMEOUT)
-        r.raise_for_status()  # pragma: no cover
-        response = r.json(parse_float=Decimal)
+        response = yield json_request(cls.MAIN_TX_AMOUNT_API.format(txid), parse_float=Decimal)
         return (Decimal(response['vout'][txindex]['value']) * BCH_TO_SAT_MULTIPLIER).normalize()
 
-    @classmethod
-    def get_unspent(cls, address):
-        r = requests.get(cls.MAIN_UNSPENT_API.format(address),
-                         timeout=DEFAULT_TIMEOUT)
-        r.raise_for_status()  # pragma: no cover
+    @staticmethod
+    def _parse_unspents(data):
         outputs = []
         last_txid = ''
-        for tx in r.json()['utxos']:
+        for tx in data['utxos']:
             if not tx['txid'] == last_txid:
                 last_txid = tx['txid']
                 outputs.append(Unspent(currency_to_satoshi(tx['amount'], 'bch'),
                     tx['confirmations'],
-                    r.json()['scriptPubKey'],
+                    data['scriptPubKey'],
                     tx['txid'],
                     tx['vout']))
         return outputs
 
-    @classmethod
+    @staticmethod
+    def _by_address(addresses, entries):
+        """Matches the entries of a multi-address answer, which name their
+        address in both formats, to the addresses asked for."""
+        names = {}
+        for address in addresses:
+            names[address] = address
+            if ':' not in address:
+                names['bitcoincash:' + address] = address
+
+        matched = {}
+        for entry in entries:
+            address = names.get(entry.get('cashAddress')) or names.get(entry.get('legacyAddress'))
+            if address is not None:
+                matched[address] = entry
+        return matched
+
+    @endpoint
+    def get_unspent(cls, address):
+        data = yield json_request(cls.MAIN_UNSPENT_API.format(address))
+        return cls._parse_unspents(data)
+
+    @endpoint
+    def get_unspent_many(cls, addresses):
+        data = yield json_request(cls.MAIN_UNSPENT_MANY_API, method='POST',
+                                  payload={'addresses': addresses})
+        return {
+            address: cls._parse_unspents(entry)
+            for address, entry in cls._by_address(addresses, data).items()
+        }
+
+    @endpoint
+    def get_balance_many(cls, addresses):
+        data = yield json_request(cls.MAIN_ADDRESS_MANY_API, method='POST',
+                                  payload={'addresses': addresses})
+        return {
+            address: entry['balanceSat'] + entry['unconfirmedBalanceSat']
+            for address, entry in cls._by_address(addresses, data).items()
+        }
+
+    @endpoint
     def get_raw_transaction(cls, txid):
-        r = requests.get(cls.MAIN_RAW_API.format(
-            txid), timeout=DEFAULT_TIMEOUT)
-        r.raise_for_status()  # pragma: no cover
-        response = r.json(parse_float=Decimal)
+        response = yield json_request(cls.MAIN_RAW_API.format(txid), parse_float=Decimal)
         return response
 
-    @classmethod
+    @endpoint
     def broadcast_tx(cls, tx_hex, x_api_key=None):  # pragma: no cover
-        r = requests.get(cls.MAIN_TX_PUSH_API.format(tx_hex))
-        print(r.status_code)
-        return True if r.status_code == 200 else False
+        status = yield status_request(cls.MAIN_TX_PUSH_API.format(tx_hex))
+        print(status)
+        return True if status == 200 else False
 
 
-class FullstackDotCash():
+class FullstackDotCash(ServiceAPI):
     """ api.fullstack.cash """
     MAIN_ENDPOINT = 'https://api.fullstack.cash/v5/'
     MAIN_TX_PUSH_API = MAIN_ENDPOINT + 'rawtransactions/sendRawTransaction/{}'
@@ -137,20 +607,16 @@ class FullstackDotCash():
     def get_balance(cls, address):
         pass
 
-    @classmethod
+    @endpoint
     def get_transactions(cls, txs):
         payload = {'txids': txs}
         headers = {"Content-Type": "application/json"}
-        r = requests.post(cls.MAIN_TXS_API, timeout=DEFAULT_TIMEOUT, json=payload, headers=headers)
-        r.raise_for_status()
-        response = r.json()
+        response = yield json_request(cls.MAIN_TXS_API, method='POST', payload=payload, headers=headers)
         return response
 
-    @classmethod
+    @endpoint
     def get_transaction(cls, txid):
-        r = requests.get(cls.MAIN_TX_API.format(txid), timeout=DEFAULT_TIMEOUT)
-        r.raise_for_status()
-        response = r.json()
+        response = yield json_request(cls.MAIN_TX_API.format(txid))
         return response
 
     @classmethod
@@ -165,11 +631,11 @@ class FullstackDotCash():
     def get_raw_transaction(cls, txid):
         pass
 
-    @classmethod
+    @endpoint
     def broadcast_tx(cls, tx_hex, x_api_key=None):  # pragma: no cover
-        r = requests.get(cls.MAIN_TX_PUSH_API.format(tx_hex))
-        print(r.status_code)
-        return True if r.status_code == 200 else False
+        status = yield status_request(cls.MAIN_TX_PUSH_API.format(tx_hex))
+        print(status)
+        return True if status == 200 else False
 
 
 class BitcoreAPI(InsightAPI):
@@ -178,6 +644,7 @@ class BitcoreAPI(InsightAPI):
     MAIN_ADDRESS_API = MAIN_ENDPOINT + 'address/{}'
     MAIN_BALANCE_API = MAIN_ADDRESS_API + '/balance'
     MAIN_UNSPENT_API = MAIN_ADDRESS_API + '/?unspent=true&limit=1000'
+    MAIN_COINS_API = MAIN_ADDRESS_API + '/?limit={}'
     MAIN_TX_PUSH_API = MAIN_ENDPOINT + 'tx/send'
     MAIN_TX_API = MAIN_ENDPOINT + 'tx/{}'
     MAIN_TX_AMOUNT_API = MAIN_TX_API
@@ -189,71 +656,114 @@ class BitcoreAPI(InsightAPI):
     MAIN_TX_PUSH_API_BTC = MAIN_ENDPOINT_BTC + 'tx/send'
     MAIN_TX_API_BTC = MAIN_ENDPOINT_BTC + 'tx/{}'
     MAIN_TX_AMOUNT_API_BTC = MAIN_TX_API_BTC
+    # The limit of MAIN_UNSPENT_API; a full page means there are more.
+    UNSPENT_PAGE_SIZE = 1000
 
     @classmethod
+    def _paged_coins(cls, url, page_size):
+        """Requests every page of coins at ``url``, continuing from the last
+        coin's id while pages come back full."""
+        coins = []
+        page_url = url
+
+        while True:
+            page = yield json_request(page_url)
+            coins.extend(page)
+            if len(page) < page_size:
+                return coins
+            page_url = url + '&since=' + page[-1]['_id']
+
+    @endpoint
     def get_unspent(cls, address):
         address = address.replace('bitcoincash:', '')
-        r = requests.get(cls.MAIN_UNSPENT_API.format(
-            address), timeout=DEFAULT_TIMEOUT)
-        r.raise_for_status()  # pragma: no cover
+        response = yield from cls._paged_coins(cls.MAIN_UNSPENT_API.format(address),
+                                               cls.UNSPENT_PAGE_SIZE)
         return [
             Unspent(currency_to_satoshi(tx['value'], 'satoshi'),
                     tx['confirmations'],
                     tx['script'],
                     tx['mintTxid'],
                     tx['mintIndex'])
-            for tx in r.json()
+            for tx in response
         ]
 
-    @classmethod
+    @endpoint
     def get_unspent_btc(cls, address):
-        r = requests.get(cls.MAIN_UNSPENT_API_BTC.format(
-            address), timeout=DEFAULT_TIMEOUT)
-        r.raise_for_status()  # pragma: no cover
+        response = yield from cls._paged_coins(cls.MAIN_UNSPENT_API_BTC.format(address),
+                                               cls.UNSPENT_PAGE_SIZE)
         return [
             Unspent(currency_to_satoshi(tx['value'], 'satoshi'),
                     tx['confirmations'],
                     tx['script'],
                     tx['mintTxid'],
                     tx['mintIndex'])
-            for tx in r.json()
+            for tx in response
         ]
 
-    @classmethod
+    @endpoint
     def get_transactions(cls, address):
         address = address.replace('bitcoincash:', '')
-        r = requests.get(cls.MAIN_ADDRESS_API.format(
-            address), timeout=DEFAULT_TIMEOUT)
-        r.raise_for_status()  # pragma: no cover
-        return [tx['mintTxid'] for tx in r.json()]
+        response = yield json_request(cls.MAIN_ADDRESS_API.format(address))
+        return [tx['mintTxid'] for tx in response]
+
+    @endpoint
+    def get_transactions_page(cls, address, cursor=None, page_size=TRANSACTION_PAGE_SIZE,
+                              since_height=None):
+        """One page of the coins of an address, as the txids that created or
+        spent them, and the cursor of the next page, if any.
+
+        Without ``since_height`` coins are listed oldest first. With it they
+        are listed newest first, and paging stops at the first coin created
+        below ``since_height``. Spends at or above it of coins created
+        earlier are only reported for the coins on the pages read, as this
+        provider cannot look coins up by the height they were spent at.
+        """
+        address = address.replace('bitcoincash:', '')
+        url = cls.MAIN_COINS_API.format(address, page_size)
+        if since_height is not None:
+            url += '&direction=-1'
+        if cursor is not None:
+            url += '&since=' + cursor
 
-    @classmethod
+        coins = yield json_request(url)
+        next_cursor = coins[-1]['_id'] if len(coins) == page_size else None
+
+        if since_height is None:
+            return [coin['mintTxid'] for coin in coins], next_cursor
+
+        txids = []
+        for coin in coins:
+            # Heights of -1 are unconfirmed; unspent coins have a spentHeight of -2.
+            if coin['mintHeight'] == -1 or coin['mintHeight'] >= since_height:
+                txids.append(coin['mintTxid'])
+            else:
+                next_cursor = None
+
+            spent_height = coin.get('spentHeight', -2)
+            if spent_height == -1 or spent_height >= since_height:
+                txids.append(coin['spentTxid'])
+
+        return list(dict.fromkeys(txids)), next_cursor
+
+    @endpoint
     def get_transactions_btc(cls, address):
-        r = requests.get(cls.MAIN_ADDRESS_API_BTC.format(
-            address), timeout=DEFAULT_TIMEOUT)
-        r.raise_for_status()  # pragma: no cover
-        return r.json()
+        response = yield json_request(cls.MAIN_ADDRESS_API_BTC.format(address))
+        return response
 
-    @classmethod
+    @endpoint
     def get_transaction_btc(cls, txid):
-        r = requests.get(cls.MAIN_TX_API_BTC.format(
-            txid), timeout=DEFAULT_TIMEOUT)
-        r.raise_for_status()  # pragma: no cover
-        return r.json()
+        response = yield json_request(cls.MAIN_TX_API_BTC.format(txid))
+        return response
 
-    @classmethod
+    @endpoint
     def get_balance(cls, address):
-        r = requests.get(cls.MAIN_BALANCE_API.format(
-            address), timeout=DEFAULT_TIMEOUT)
-        r.raise_for_status()  # pragma: no cover
-        return r.json()['balance']
+        response = yield json_request(cls.MAIN_BALANCE_API.format(address))
+        return response['balance']
 
-    @classmethod
+    @endpoint
     def get_balance_btc(cls, address):
-        r = requests.get(cls.MAIN_BALANCE_API_BTC.format(
-            address), timeout=DEFAULT_TIMEOUT)
-        r.raise_for_status()  # pragma: no cover
-        return r.json()['balance']
+        response = yield json_request(cls.MAIN_BALANCE_API_BTC.format(address))
+        return response['balance']
 
 
 class TatumApi(InsightAPI):
@@ -268,24 +778,22 @@ class TatumApi(InsightAPI):
     MAIN_TX_API_BTC = MAIN_ENDPOINT_BTC + 'transaction/{}'
     MAIN_BLOCK_INFO_BTC = MAIN_ENDPOINT_BTC + 'info'
 
-    @classmethod
+    @endpoint
     def get_block_number_btc(cls, x_api_key=None):
         headers = {
             "x-api-key": x_api_key
         }
-        r = requests.get(cls.MAIN_BLOCK_INFO_BTC, timeout=DEFAULT_TIMEOUT, headers=headers)
-        r.raise_for_status()
-        return int(r.json()['blocks'])
+        response = yield json_request(cls.MAIN_BLOCK_INFO_BTC, headers=headers)
+        return int(response['blocks'])
 
-    @classmethod
+    @endpoint
     def get_block_number(cls, x_api_key=None):
         headers = {
             "x-api-key": x_api_key
         }
-        r = requests.get(cls.MAIN_BLOCK_INFO, timeout=DEFAULT_TIMEOUT, headers=headers)
-        r.raise_for_status()
-        return int(r.json()['blocks'])
-        
+        response = yield json_request(cls.MAIN_BLOCK_INFO, headers=headers)
+        return int(response['blocks'])
+
     @classmethod
     def get_unspent(cls, address):
         pass
@@ -294,36 +802,33 @@ class TatumApi(InsightAPI):
     def get_unspent_btc(cls, address):
         pass
 
-    @classmethod
+    @endpoint
     def get_transactions_by_address(cls, address, x_api_key=None):
         headers = {
             "x-api-key": x_api_key
         }
-        r = requests.get(cls.MAIN_TXS_BY_ADDRESS_API.format(address), timeout=DEFAULT_TIMEOUT, headers=headers)
-        r.raise_for_status()
-        return r.json()
+        response = yield json_request(cls.MAIN_TXS_BY_ADDRESS_API.format(address), headers=headers)
+        return response
 
     @classmethod
     def get_transactions_btc(cls, address):
         pass
 
-    @classmethod
+    @endpoint
     def get_transaction(cls, txid, x_api_key=None):
         headers = {
             "x-api-key": x_api_key
         }
-        r = requests.get(cls.MAIN_TX_API.format(txid), timeout=DEFAULT_TIMEOUT, headers=headers)
-        r.raise_for_status()
-        return r.json()
+        response = yield json_request(cls.MAIN_TX_API.format(txid), headers=headers)
+        return response
 
-    @classmethod
+    @endpoint
     def get_transaction_btc(cls, txid, x_api_key=None):
         headers = {
             "x-api-key": x_api_key
         }
-        r = requests.get(cls.MAIN_TX_API_BTC.format(txid), timeout=DEFAULT_TIMEOUT, headers=headers)
-        r.raise_for_status()
-        return r.json()
+        response = yield json_request(cls.MAIN_TX_API_BTC.format(txid), headers=headers)
+        return response
 
     @classmethod
     def get_balance(cls, address):
@@ -333,14 +838,15 @@ class TatumApi(InsightAPI):
     def get_balance_btc(cls, address):
         pass
 
-    @classmethod
+    @endpoint
     def broadcast_tx(cls, tx_hex, x_api_key=None):
         headers = {
             "Content-Type": "application/json",
              "x-api-key": x_api_key
         }
-        res = requests.post(cls.MAIN_TX_PUSH_API, json={"txData": tx_hex}, headers=headers)
-        return True if res.status_code == 200 else False
+        status = yield status_request(cls.MAIN_TX_PUSH_API, method='POST', payload={"txData": tx_hex},
+                                      headers=headers)
+        return True if status == 200 else False
 
 
 class BlockchairApi(InsightAPI):
@@ -360,12 +866,11 @@ class BlockchairApi(InsightAPI):
     def get_block_number_btc(cls, x_api_key=None):
         pass
 
-    @classmethod
+    @endpoint
     def get_block_number(cls, x_api_key=None):
-        r = requests.get(cls.MAIN_STATS_API, timeout=DEFAULT_TIMEOUT)
-        r.raise_for_status()
-        return r.json()['blocks']
-        
+        response = yield json_request(cls.MAIN_STATS_API)
+        return response['blocks']
+
     @classmethod
     def get_unspent(cls, address, x_api_key=None):
         pass
@@ -374,33 +879,51 @@ class BlockchairApi(InsightAPI):
     def get_unspent_btc(cls, address, x_api_key=None):
         pass
 
-    @classmethod
+    @endpoint
     def get_transactions_by_address(cls, address, x_api_key=None):
-        r = requests.get(cls.MAIN_ADDRESS_API.format(address), timeout=DEFAULT_TIMEOUT)
-        r.raise_for_status()
-        return r.json()
+        response = yield json_request(cls.MAIN_ADDRESS_API.format(address))
+        return response
 
-    @classmethod
+    @endpoint
+    def get_transactions_page(cls, address, cursor=None, page_size=TRANSACTION_PAGE_SIZE,
+                              since_height=None):
+        """One page of the transactions of an address, newest first, and
+        the offset of the next page, if any. Paging stops at the first
+        transaction mined below ``since_height``."""
+        offset = cursor or 0
+        response = yield json_request(
+            cls.MAIN_ADDRESS_API.format(address) +
+            '?limit={}&offset={}&transaction_details=true'.format(page_size, offset)
+        )
+        transactions = next(iter(response['data'].values()))['transactions']
+
+        txids = []
+        for tx in transactions:
+            # Unconfirmed transactions have a block_id of -1.
+            if since_height is not None and 0 <= tx['block_id'] < since_height:
+                return txids, None
+            txids.append(tx['hash'])
+
+        return txids, (offset + page_size if len(transactions) == page_size else None)
+
+    @endpoint
     def get_transactions(cls, txids, x_api_key=None):
         txids_query = ''
         for txid in txids:
             if txid != txids[0]:
                 txids_query = txids_query + ','
             txids_query = txids_query + txid
-        r = requests.get(cls.MAIN_TXS_API.format(txids_query), timeout=DEFAULT_TIMEOUT)
-        r.raise_for_status()
-        response = r.json()
+        response = yield json_request(cls.MAIN_TXS_API.format(txids_query))
         return response
 
     @classmethod
     def get_transactions_btc(cls, address, x_api_key=None):
         pass
 
-    @classmethod
+    @endpoint
     def get_transaction(cls, txid, x_api_key=None):
-        r = requests.get(cls.MAIN_TX_API.format(txid), timeout=DEFAULT_TIMEOUT)
-        r.raise_for_status()
-        return r.json()
+        response = yield json_request(cls.MAIN_TX_API.format(txid))
+        return response
 
     @classmethod
     def get_transaction_btc(cls, txid, x_api_key=None):
@@ -454,7 +977,132 @@ class NetworkAPI:
                           BitcoreAPI.get_tx_amount]
     GET_RAW_TX_MAIN = [BitcoinDotComAPI.get_raw_transaction]
 
+    ITER_TRANSACTIONS_MAIN = [BlockchairApi.get_transactions_page,
+                              BitcoreAPI.get_transactions_page]
+
+    # Endpoints answering for up to MULTI_ADDRESS_LIMIT addresses at once.
+    GET_BALANCE_MANY_MAIN = [BitcoinDotComAPI.get_balance_many]
+    GET_UNSPENT_MANY_MAIN = [BitcoinDotComAPI.get_unspent_many]
+
+    @classmethod
+    def _first_answer(cls, api_calls, *args):
+
+        api_calls = rank_providers(api_calls)
+
+        if HEDGE_REQUESTS:
+            return cls._hedged_answer(api_calls, *args)
+
+        for api_call in api_calls:
+            try:
+                return timed_call(api_call, *args)
+            except cls.IGNORED_ERRORS:
+                pass
+
+        raise ConnectionError('All APIs are unreachable.')
+
     @classmethod
+    def _stored_answer(cls, lookup, api_calls, txid, *args):
+        """Answers a transaction lookup from the transaction store if set,
+        storing the network's answer once the transaction is confirmed."""
+        store = txstore.TX_STORE
+
+        if store is not None:
+            response = store.get(lookup, txid)
+            if response is not None:
+                return response
+
+        response = cls._first_answer(api_calls, txid, *args)
+
+        if store is not None and transaction_ttl(response) is FOREVER:
+            store.put(lookup, txid, response, _raw_bytes(response))
+
+        return response
+
+    @classmethod
+    def _batch_answer(cls, api_calls, addresses):
+        try:
+            return cls._first_answer(api_calls, addresses)
+        except ConnectionError:
+            return {}
+
+    @staticmethod
+    def _single_answer(single_call, address):
+        try:
+            return True, single_call(address)
+        except ConnectionError as e:
+            return False, e
+
+    @classmethod
+    def _lookup_many(cls, batch_calls, single_call, addresses, workers):
+        """Looks ``addresses`` up in chunks through ``batch_calls``, then
+        fans the ones left out over ``single_call``, at most ``workers`` at
+        a time. Addresses every provider failed for are listed in the
+        result's ``failed`` rather than failing the whole lookup.
+        """
+        addresses = list(dict.fromkeys(addresses))
+        results = {}
+        failed = []
+
+        with ThreadPoolExecutor(workers) as executor:
+            if batch_calls:
+                chunks = [
+                    addresses[i:i + MULTI_ADDRESS_LIMIT]
+                    for i in range(0, len(addresses), MULTI_ADDRESS_LIMIT)
+                ]
+                for answer in executor.map(cls._batch_answer, repeat(batch_calls), chunks):
+                    results.update(answer)
+
+            missing = [address for address in addresses if address not in results]
+            answers = executor.map(cls._single_answer, repeat(single_call), missing)
+            for address, (ok, answer) in zip(missing, answers):
+                if ok:
+                    results[address] = answer
+                else:
+                    failed.append(address)
+
+        if failed and not results:
+            raise ConnectionError('All APIs are unreachable.')
+
+        return LookupResults(
+            ((address, results[address]) for address in addresses if address in results),
+            failed=failed
+        )
+
+    @classmethod
+    def _hedged_answer(cls, api_calls, *args):
+        """Asks the providers in order, starting the next one early whenever
+        the latest has been slower than usual, and returns the first valid
+        answer. Calls still waiting to start are cancelled; ones already in
+        flight finish in the background and are discarded.
+        """
+        executor = _get_hedge_executor()
+        remaining = list(api_calls)
+        pending = set()
+        delay = None
+
+        try:
+            while pending or remaining:
+                if remaining and (not pending or delay is not None):
+                    api_call = remaining.pop(0)
+                    pending.add(executor.submit(timed_call, api_call, *args))
+                    delay = hedge_delay(api_call) if remaining else None
+
+                done, pending = wait(pending, timeout=delay, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    try:
+                        return future.result()
+                    except cls.IGNORED_ERRORS:
+                        # Fall back to the next provider straight away.
+                        delay = 0 if remaining else None
+        finally:
+            for future in pending:
+                future.cancel()
+
+        raise ConnectionError('All APIs are unreachable.')
+
+    @classmethod
+    @cached(UNSPENT_TTL)
     def get_balance(cls, address):
         """Gets the balance of an address in satoshi.
 
@@ -464,15 +1112,10 @@ class NetworkAPI:
         :rtype: ``int``
         """
 
-        for api_call in cls.GET_BALANCE_MAIN:
-            try:
-                return api_call(address)
-            except cls.IGNORED_ERRORS:
-                pass
-
-        raise ConnectionError('All APIs are unreachable.')
+        return cls._first_answer(cls.GET_BALANCE_MAIN, address)
 
     @classmethod
+    @cached(UNSPENT_TTL)
     def get_balance_btc(cls, address):
         """Gets the balance of an address in satoshi.
 
@@ -482,13 +1125,7 @@ class NetworkAPI:
         :rtype: ``int``
         """
 
-        for api_call in cls.GET_BALANCE_MAIN_BTC:
-            try:
-                return api_call(address)
-            except cls.IGNORED_ERRORS:
-                pass
-
-        raise ConnectionError('All APIs are unreachable.')
+        return cls._first_answer(cls.GET_BALANCE_MAIN_BTC, address)
 
     @classmethod
     def get_transactions(cls, txs):
@@ -500,13 +1137,34 @@ class NetworkAPI:
         :rtype: ``list`` of ``str``
         """
 
-        for api_call in cls.GET_TRANSACTIONS_MAIN:
-            try:
-                return api_call(txs)
-            except cls.IGNORED_ERRORS:
-                pass
+        store = txstore.TX_STORE
 
-        raise ConnectionError('All APIs are unreachable.')
+        if store is None:
+            return cls._first_answer(cls.GET_TRANSACTIONS_MAIN, txs)
+
+        # Stored transactions are the same dashboards get_transaction keeps.
+        data = {}
+        for txid in txs:
+            stored = store.get('get_transaction', txid)
+            if stored is not None:
+                data.update(stored['data'])
+
+        missing = [txid for txid in txs if txid not in data]
+        if not missing:
+            return {'data': data}
+
+        response = cls._first_answer(cls.GET_TRANSACTIONS_MAIN, missing)
+        if not isinstance(response.get('data'), dict):
+            return response
+
+        for txid, entry in response['data'].items():
+            single = {'data': {txid: entry}}
+            if transaction_ttl(single) is FOREVER:
+                store.put('get_transaction', txid, single, _raw_bytes(single))
+
+        data.update(response['data'])
+        response['data'] = {txid: data[txid] for txid in txs if txid in data}
+        return response
 
     @classmethod
     def get_transactions_by_address(cls, address, x_api_key=None):
@@ -518,13 +1176,7 @@ class NetworkAPI:
         :rtype: ``list`` of ``str``
         """
 
-        for api_call in cls.GET_TXS_BY_ADDRESS_MAIN:
-            try:
-                return api_call(address, x_api_key)
-            except cls.IGNORED_ERRORS:
-                pass
-
-        raise ConnectionError('All APIs are unreachable.')
+        return cls._first_answer(cls.GET_TXS_BY_ADDRESS_MAIN, address, x_api_key)
 
     @classmethod
     def get_transactions_btc(cls, address):
@@ -536,15 +1188,10 @@ class NetworkAPI:
         :rtype: ``list`` of ``str``
         """
 
-        for api_call in cls.GET_TRANSACTIONS_MAIN_BTC:
-            try:
-                return api_call(address)
-            except cls.IGNORED_ERRORS:
-                pass
-
-        raise ConnectionError('All APIs are unreachable.')
+        return cls._first_answer(cls.GET_TRANSACTIONS_MAIN_BTC, address)
 
     @classmethod
+    @cached(transaction_ttl, mutable=False)
     def get_transaction(cls, txid, x_api_key=None):
         """Gets the full transaction details.
 
@@ -554,14 +1201,10 @@ class NetworkAPI:
         :rtype: ``Transaction``
         """
 
-        for api_call in cls.GET_TX_MAIN:
-            try:
-                return api_call(txid, x_api_key)
-            except cls.IGNORED_ERRORS:
-                pass
+        return cls._stored_answer('get_transaction', cls.GET_TX_MAIN, txid, x_api_key)
 
-        raise ConnectionError('All APIs are unreachable.')
     @classmethod
+    @cached(transaction_ttl, mutable=False)
     def get_transaction_btc(cls, txid, x_api_key=None):
         """Gets the full transaction details.
 
@@ -571,15 +1214,11 @@ class NetworkAPI:
         :rtype: ``Transaction``
         """
 
-        for api_call in cls.GET_TRANSACTION_MAIN_BTC:
-            try:
-                return api_call(txid, x_api_key)
-            except cls.IGNORED_ERRORS:
-                pass
-
-        raise ConnectionError('All APIs are unreachable.')
+        return cls._stored_answer('get_transaction_btc', cls.GET_TRANSACTION_MAIN_BTC, txid,
+                                  x_api_key)
 
     @classmethod
+    @cached(FOREVER, mutable=False)
     def get_tx_amount(cls, txid, txindex):
         """Gets the amount of a given transaction output.
 
@@ -591,15 +1230,10 @@ class NetworkAPI:
         :rtype: ``Decimal``
         """
 
-        for api_call in cls.GET_TX_AMOUNT_MAIN:
-            try:
-                return api_call(txid, txindex)
-            except cls.IGNORED_ERRORS:
-                pass
-
-        raise ConnectionError('All APIs are unreachable.')
+        return cls._first_answer(cls.GET_TX_AMOUNT_MAIN, txid, txindex)
 
     @classmethod
+    @cached(UNSPENT_TTL)
     def get_unspent(cls, address):
         """Gets all unspent transaction outputs belonging to an address.
 
@@ -609,15 +1243,10 @@ class NetworkAPI:
         :rtype: ``list`` of :class:`~bitcash.network.meta.Unspent`
         """
 
-        for api_call in cls.GET_UNSPENT_MAIN:
-            try:
-                return api_call(address)
-            except cls.IGNORED_ERRORS:
-                pass
-
-        raise ConnectionError('All APIs are unreachable.')
+        return cls._first_answer(cls.GET_UNSPENT_MAIN, address)
 
     @classmethod
+    @cached(UNSPENT_TTL)
     def get_unspent_btc(cls, address):
         """Gets all unspent transaction outputs belonging to an address.
 
@@ -627,15 +1256,10 @@ class NetworkAPI:
         :rtype: ``list`` of :class:`~bitcash.network.meta.Unspent`
         """
 
-        for api_call in cls.GET_UNSPENT_MAIN_BTC:
-            try:
-                return api_call(address)
-            except cls.IGNORED_ERRORS:
-                pass
-
-        raise ConnectionError('All APIs are unreachable.')
+        return cls._first_answer(cls.GET_UNSPENT_MAIN_BTC, address)
 
     @classmethod
+    @cached(transaction_ttl, mutable=False)
     def get_raw_transaction(cls, txid):
         """Gets the raw, unparsed transaction details.
 
@@ -645,13 +1269,80 @@ class NetworkAPI:
         :rtype: ``Transaction``
         """
 
-        for api_call in cls.GET_RAW_TX_MAIN:
+        return cls._stored_answer('get_raw_transaction', cls.GET_RAW_TX_MAIN, txid)
+
+    @classmethod
+    def iter_transactions(cls, address, since_height=None, page_size=TRANSACTION_PAGE_SIZE):
+        """Lazily pages through the transaction history of an address, so
+        only one page is held at a time and nothing more is requested once
+        the caller stops iterating. Paging stays with the provider that
+        answered the first page, as cursors differ between providers.
+
+        :param address: The address in question.
+        :type address: ``str``
+        :param since_height: If given, transactions mined below this block
+                             height are skipped, and paging stops once the
+                             history reaches them. Some providers may miss
+                             spends of coins created below it.
+        :type since_height: ``int``
+        :param page_size: The number of transactions requested per page.
+        :type page_size: ``int``
+        :raises ConnectionError: If all API services fail.
+        :returns: Transaction IDs. Their order is up to the provider.
+        :rtype: generator of ``str``
+        """
+
+        for api_call in rank_providers(cls.ITER_TRANSACTIONS_MAIN):
             try:
-                return api_call(txid)
+                txids, cursor = timed_call(api_call, address, None, page_size, since_height)
+                break
             except cls.IGNORED_ERRORS:
                 pass
+        else:
+            raise ConnectionError('All APIs are unreachable.')
 
-        raise ConnectionError('All APIs are unreachable.')
+        yield from txids
+
+        while cursor is not None:
+            try:
+                txids, cursor = timed_call(api_call, address, cursor, page_size, since_height)
+            except cls.IGNORED_ERRORS:
+                raise ConnectionError('{} failed while paging.'.format(api_call.provider.__name__))
+            yield from txids
+
+    @classmethod
+    def get_balance_many(cls, addresses, workers=FAN_OUT_WORKERS):
+        """Gets the balance of many addresses, using multi-address endpoints
+        where a provider has them and concurrent single lookups otherwise.
+
+        :param addresses: The addresses in question.
+        :type addresses: ``list`` of ``str``
+        :param workers: The number of requests in flight at once.
+        :type workers: ``int``
+        :raises ConnectionError: If all API services fail for every address.
+        :returns: The balance in satoshi of every address answered for.
+        :rtype: :class:`LookupResults`
+        """
+
+        return cls._lookup_many(cls.GET_BALANCE_MANY_MAIN, cls.get_balance, addresses, workers)
+
+    @classmethod
+    def get_unspent_many(cls, addresses, workers=FAN_OUT_WORKERS):
+        """Gets the unspent transaction outputs of many addresses, using
+        multi-address endpoints where a provider has them and concurrent
+        single lookups otherwise.
+
+        :param addresses: The addresses in question.
+        :type addresses: ``list`` of ``str``
+        :param workers: The number of requests in flight at once.
+        :type workers: ``int``
+        :raises ConnectionError: If all API services fail for every address.
+        :returns: The unspents of every address answered for, as ``list`` of
+                  :class:`~bitcoinpython.network.meta.Unspent`.
+        :rtype: :class:`LookupResults`
+        """
+
+        return cls._lookup_many(cls.GET_UNSPENT_MANY_MAIN, cls.get_unspent, addresses, workers)
 
     @classmethod
     def broadcast_tx(cls, tx_hex, x_api_key=None):  # pragma: no cover
@@ -668,6 +1359,7 @@ class NetworkAPI:
                 success = api_call(tx_hex, x_api_key)
                 if not success:
                     continue
+                invalidate_mutable()
                 return
             except cls.IGNORED_ERRORS:
                 pass
@@ -680,6 +1372,7 @@ class NetworkAPI:
 
 
     @classmethod
+    @cached(BLOCK_NUMBER_TTL, mutable=False)
     def get_block_number_btc(cls, x_api_key=None):
         """Gets the ID of all transactions related to an address.
 
@@ -689,21 +1382,10 @@ class NetworkAPI:
         :rtype: ``list`` of ``str``
         """
 
-        for api_call in cls.GET_BLOCK_NUMBER_BTC:
-            try:
-                return api_call(x_api_key)
-            except cls.IGNORED_ERRORS:
-                pass
-
-        raise ConnectionError('All APIs are unreachable.')
+        return cls._first_answer(cls.GET_BLOCK_NUMBER_BTC, x_api_key)
 
     
     @classmethod
+    @cached(BLOCK_NUMBER_TTL, mutable=False)
     def get_block_number(cls, x_api_key=None):
-        for api_call in cls.GET_BLOCK_NUMBER:
-            try:
-                return api_call(x_api_key)
-            except cls.IGNORED_ERRORS:
-                pass
-
-        raise ConnectionError('All APIs are unreachable.')
+        return cls._first_answer(cls.GET_BLOCK_NUMBER, x_api_key)
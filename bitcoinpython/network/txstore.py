@@ -0,0 +1,93 @@
+import json
+import sqlite3
+from decimal import Decimal
+from threading import Lock
+
+TX_STORE = None
+
+
+def _encode_value(value):
+    if isinstance(value, Decimal):
+        return {'__decimal__': str(value)}
+    raise TypeError('{!r} is not JSON serializable'.format(value))
+
+
+def _decode_object(obj):
+    if len(obj) == 1 and '__decimal__' in obj:
+        return Decimal(obj['__decimal__'])
+    return obj
+
+
+class TransactionStore:
+    """Keeps confirmed transactions fetched from the network in sqlite,
+    keyed by the lookup that fetched them and their txid, so they are never
+    downloaded twice. Answers are stored as parsed, with ``Decimal`` amounts
+    intact, along with the raw transaction bytes where the provider sent them.
+
+    :param path: The database file. By default the store only lives in memory.
+    :type path: ``str``
+    """
+
+    def __init__(self, path=':memory:'):
+        self._lock = Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS transactions ('
+            'lookup TEXT NOT NULL, txid TEXT NOT NULL, raw BLOB, data TEXT NOT NULL, '
+            'PRIMARY KEY (lookup, txid))'
+        )
+        self._db.commit()
+
+    def get(self, lookup, txid):
+        """Returns the stored answer, or ``None``."""
+        with self._lock:
+            row = self._db.execute(
+                'SELECT data FROM transactions WHERE lookup = ? AND txid = ?', (lookup, txid)
+            ).fetchone()
+
+        if row is None:
+            return None
+        return json.loads(row[0], object_hook=_decode_object)
+
+    def get_raw(self, txid):
+        """Returns the raw bytes of a stored transaction, or ``None``.
+
+        :rtype: ``bytes``
+        """
+        with self._lock:
+            row = self._db.execute(
+                'SELECT raw FROM transactions WHERE txid = ? AND raw IS NOT NULL', (txid,)
+            ).fetchone()
+
+        return None if row is None else row[0]
+
+    def put(self, lookup, txid, data, raw=None):
+        encoded = json.dumps(data, default=_encode_value)
+
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO transactions VALUES (?, ?, ?, ?)',
+                (lookup, txid, raw, encoded)
+            )
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute('SELECT COUNT(*) FROM transactions').fetchone()[0]
+
+
+def set_transaction_store(path):
+    """Makes :class:`~bitcoinpython.network.NetworkAPI` look transactions up
+    in a persistent store at ``path`` before asking the network. ``None``
+    disables it.
+    """
+    global TX_STORE
+
+    if TX_STORE is not None:
+        TX_STORE.close()
+
+    TX_STORE = None if path is None else TransactionStore(path)
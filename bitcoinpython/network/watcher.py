@@ -0,0 +1,199 @@
+import sqlite3
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+from bitcoinpython.network.meta import Unspent
+from bitcoinpython.network.services import FAN_OUT_WORKERS, LookupResults, NetworkAPI
+
+WatchEvent = namedtuple('WatchEvent', ('kind', 'address', 'unspent', 'height'))
+
+# WatchEvent kinds
+UNSPENT_ADDED = 'added'
+UNSPENT_SPENT = 'spent'
+
+
+class AddressWatcher:
+    """Watches addresses for incoming and outgoing coins without
+    re-downloading their history.
+
+    Every address remembers the block height it was last checked at. A poll
+    only asks addresses without known unspents for transactions from that
+    height on, and only those that have any are looked up again. Addresses
+    holding unspents are always looked up, as history providers cannot be
+    relied on to report spends of older coins. Lookups are batched, and the
+    unspents found are compared to the known ones to produce events. The
+    checkpoints and known unspents are kept in sqlite, so a restarted watcher
+    picks up where it left off.
+
+    :param addresses: The addresses to watch.
+    :type addresses: iterable of ``str``
+    :param path: The database file. By default the state only lives in memory.
+    :type path: ``str``
+    :param include_mempool: Whether to check addresses without known unspents
+                            for new transactions on every poll. If not, they
+                            are only checked once a block was mined since
+                            their last check, and any unconfirmed transactions
+                            count as activity then. Addresses holding unspents
+                            are looked up on every poll either way.
+    :type include_mempool: ``bool``
+    :param workers: The number of history lookups in flight at once.
+    :type workers: ``int``
+    """
+
+    def __init__(self, addresses=(), path=':memory:', include_mempool=True,
+                 workers=FAN_OUT_WORKERS):
+        self.include_mempool = include_mempool
+        self.workers = workers
+        self.height = None
+
+        self._lock = Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS watched ('
+            'address TEXT PRIMARY KEY, height INTEGER)'
+        )
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS unspents ('
+            'address TEXT NOT NULL, txid TEXT NOT NULL, txindex INTEGER NOT NULL, '
+            'amount INTEGER NOT NULL, confirmations INTEGER NOT NULL, script TEXT NOT NULL, '
+            'PRIMARY KEY (txid, txindex))'
+        )
+        self._db.commit()
+
+        self._heights = dict(self._db.execute('SELECT address, height FROM watched'))
+        self._unspents = {address: {} for address in self._heights}
+        for address, txid, txindex, amount, confirmations, script in self._db.execute(
+                'SELECT address, txid, txindex, amount, confirmations, script FROM unspents'):
+            self._unspents[address][(txid, txindex)] = Unspent(
+                amount, confirmations, script, txid, txindex
+            )
+
+        self.add(addresses)
+
+    @property
+    def addresses(self):
+        return list(self._heights)
+
+    def add(self, addresses):
+        """Starts watching ``addresses``. Their current unspents are reported
+        as added on the next poll."""
+        with self._lock:
+            new = [address for address in addresses if address not in self._heights]
+            for address in new:
+                self._heights[address] = None
+                self._unspents[address] = {}
+            self._db.executemany('INSERT OR IGNORE INTO watched VALUES (?, NULL)',
+                                 ((address,) for address in new))
+            self._db.commit()
+
+    def remove(self, addresses):
+        with self._lock:
+            for address in addresses:
+                self._heights.pop(address, None)
+                self._unspents.pop(address, None)
+                self._db.execute('DELETE FROM watched WHERE address = ?', (address,))
+                self._db.execute('DELETE FROM unspents WHERE address = ?', (address,))
+            self._db.commit()
+
+    def unspents(self, address):
+        """The unspents of a watched address as of the last poll.
+
+        :rtype: ``list`` of :class:`~bitcoinpython.network.meta.Unspent`
+        """
+        return list(self._unspents[address].values())
+
+    @staticmethod
+    def _has_activity(address, since_height):
+        transactions = NetworkAPI.iter_transactions(address, since_height=since_height,
+                                                    page_size=1)
+        return next(transactions, None) is not None
+
+    def _changed(self, heights, holding, height):
+        # Spends only matter where we know of unspents, and are found by
+        # comparing them rather than through the history.
+        unchecked = [
+            address for address, last in heights.items()
+            if last is None or address in holding
+        ]
+        checked = [
+            address for address, last in heights.items()
+            if last is not None and address not in holding
+        ]
+
+        if not self.include_mempool:
+            checked = [address for address in checked if heights[address] < height]
+
+        # The last checked block is asked for again in case the history
+        # provider had not indexed it yet.
+        with ThreadPoolExecutor(self.workers) as executor:
+            active = executor.map(self._has_activity, checked, map(heights.get, checked))
+            return unchecked + [address for address, busy in zip(checked, active) if busy]
+
+    def poll(self):
+        """Checks every watched address once.
+
+        :raises ConnectionError: If all API services fail.
+        :returns: The unspents added to and spent from watched addresses
+                  since the last poll.
+        :rtype: ``list`` of :class:`WatchEvent`
+        """
+        with self._lock:
+            heights = dict(self._heights)
+            holding = {address for address, known in self._unspents.items() if known}
+
+        height = NetworkAPI.get_block_number()
+        changed = self._changed(heights, holding, height)
+        current = NetworkAPI.get_unspent_many(changed) if changed else LookupResults()
+        events = []
+
+        with self._lock:
+            for address, unspents in current.items():
+                if address not in self._heights:
+                    continue
+
+                known = self._unspents[address]
+                found = {(unspent.txid, unspent.txindex): unspent for unspent in unspents}
+
+                for key in found.keys() - known.keys():
+                    events.append(WatchEvent(UNSPENT_ADDED, address, found[key], height))
+                    self._db.execute(
+                        'INSERT OR REPLACE INTO unspents VALUES (?, ?, ?, ?, ?, ?)',
+                        (address, key[0], key[1], found[key].amount,
+                         found[key].confirmations, found[key].script)
+                    )
+
+                for key in known.keys() - found.keys():
+                    events.append(WatchEvent(UNSPENT_SPENT, address, known[key], height))
+                    self._db.execute('DELETE FROM unspents WHERE txid = ? AND txindex = ?', key)
+
+                self._unspents[address] = found
+
+            # Addresses whose lookup failed are checked again next time.
+            failed = set(current.failed)
+            polled = [
+                address for address in heights
+                if address in self._heights and address not in failed
+            ]
+            for address in polled:
+                self._heights[address] = height
+            self._db.executemany('UPDATE watched SET height = ? WHERE address = ?',
+                                 ((height, address) for address in polled))
+            self._db.commit()
+
+        self.height = height
+        return events
+
+    def follow(self, interval=60):
+        """Polls every ``interval`` seconds and yields events as they occur.
+
+        :rtype: generator of :class:`WatchEvent`
+        """
+        while True:
+            yield from self.poll()
+            time.sleep(interval)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
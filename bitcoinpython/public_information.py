@@ -1,4 +1,4 @@
-from bitcoinpython.network import NetworkAPI, get_fee, satoshi_to_currency_cached
+from bitcoinpython.network import LookupResults, NetworkAPI, get_fee, satoshi_to_currency_cached
 
 
 def get_balance(address, currency='satoshi'):
@@ -9,6 +9,23 @@ def get_balance(address, currency='satoshi'):
     return satoshi_to_currency_cached(balance, currency.lower())
 
 
+def get_balances(addresses, currency='satoshi'):
+    """Fetches the balance of many addresses at once.
+
+    :raises ConnectionError: If all API services fail for every address.
+    :returns: The balance of every address answered for. Addresses whose
+              lookup failed are listed in ``failed``.
+    :rtype: :class:`~bitcoinpython.network.LookupResults`
+    """
+    answers = NetworkAPI.get_unspent_many(addresses)
+    return LookupResults(
+        ((address, satoshi_to_currency_cached(sum(unspent.amount for unspent in unspents),
+                                              currency.lower()))
+         for address, unspents in answers.items()),
+        failed=answers.failed
+    )
+
+
 def get_balance_btc(address, currency='satoshi'):
     unspents = []
     balance = 0
@@ -46,6 +63,14 @@ def get_transactions_by_address(address, x_api_key=None):
     return transactions
 
 
+def iter_transactions(address, since_height=None):
+    """Lazily fetches transaction history, a page at a time.
+
+    :rtype: generator of ``str`` transaction IDs
+    """
+    return NetworkAPI.iter_transactions(address, since_height)
+
+
 def get_transaction(txid, x_api_key=None):
     transaction = NetworkAPI.get_transaction(txid, x_api_key)
     return transaction
@@ -0,0 +1,318 @@
+from bitcoinpython.crypto import double_sha256
+from bitcoinpython.format import CASHADDR_P2PKH, CASHADDR_P2SH, hash160_to_cashaddr
+from bitcoinpython.network.transaction import TxPart
+from bitcoinpython.transaction import (
+    OP_CHECKSIG, OP_DUP, OP_EQUAL, OP_EQUALVERIFY, OP_HASH160, OP_PUSH_20, OP_PUSHDATA1,
+    OP_PUSHDATA2, OP_PUSHDATA4, OP_RETURN
+)
+from bitcoinpython.utils import bytes_to_hex, hex_to_bytes
+
+# The bytes around the hash160 in P2PKH and P2SH locking scripts.
+P2PKH_PREFIX = OP_DUP + OP_HASH160 + OP_PUSH_20
+P2PKH_SUFFIX = OP_EQUALVERIFY + OP_CHECKSIG
+P2SH_PREFIX = OP_HASH160 + OP_PUSH_20
+P2SH_SUFFIX = OP_EQUAL
+
+# Bytes of data length following each OP_PUSHDATA opcode.
+PUSHDATA_LENGTH_SIZES = {OP_PUSHDATA1[0]: 1, OP_PUSHDATA2[0]: 2, OP_PUSHDATA4[0]: 4}
+
+# Output script types
+P2PKH = 'p2pkh'
+P2SH = 'p2sh'
+NULL_DATA = 'nulldata'
+NONSTANDARD = 'nonstandard'
+
+
+def read_varint(data, offset):
+    """Reads the variable length integer at ``offset`` of ``data``.
+
+    :returns: The integer and the offset past it.
+    :rtype: ``tuple``
+    """
+    prefix = data[offset]
+
+    if prefix < 0xfd:
+        return prefix, offset + 1
+
+    size = 2 if prefix == 0xfd else 4 if prefix == 0xfe else 8
+    end = offset + 1 + size
+    if end > len(data):
+        raise ValueError('Truncated variable length integer.')
+
+    return int.from_bytes(data[offset + 1:end], 'little'), end
+
+
+class RawTxIn:
+    """An input of a :class:`RawTransaction`. Its fields are read from the
+    transaction bytes when accessed.
+    """
+    __slots__ = ('_view', '_offset', '_script_start', '_script_end')
+
+    def __init__(self, view, offset, script_start, script_end):
+        self._view = view
+        self._offset = offset
+        self._script_start = script_start
+        self._script_end = script_end
+
+    @property
+    def txid(self):
+        """The ID of the transaction whose output is spent."""
+        return bytes_to_hex(self._view[self._offset:self._offset + 32].tobytes()[::-1])
+
+    @property
+    def txindex(self):
+        return int.from_bytes(self._view[self._offset + 32:self._offset + 36], 'little')
+
+    @property
+    def script(self):
+        """The unlocking script.
+
+        :rtype: ``bytes``
+        """
+        return self._view[self._script_start:self._script_end].tobytes()
+
+    @property
+    def outpoint(self):
+        """The spent output as in the transaction bytes, the txid in internal
+        byte order followed by the 4 byte index, without copying.
+
+        :rtype: ``memoryview``
+        """
+        return self._view[self._offset:self._offset + 36]
+
+    @property
+    def sequence(self):
+        return int.from_bytes(self._view[self._script_end:self._script_end + 4], 'little')
+
+    def __repr__(self):
+        return 'RawTxIn({}:{})'.format(self.txid, self.txindex)
+
+
+class RawTxOut:
+    """An output of a :class:`RawTransaction`. Its fields are read from the
+    transaction bytes when accessed.
+    """
+    __slots__ = ('_view', '_offset', '_script_start', '_script_end')
+
+    def __init__(self, view, offset, script_start, script_end):
+        self._view = view
+        self._offset = offset
+        self._script_start = script_start
+        self._script_end = script_end
+
+    @property
+    def amount(self):
+        """The value in satoshi."""
+        return int.from_bytes(self._view[self._offset:self._offset + 8], 'little')
+
+    @property
+    def script(self):
+        """The locking script.
+
+        :rtype: ``bytes``
+        """
+        return self._view[self._script_start:self._script_end].tobytes()
+
+    @property
+    def type(self):
+        view, start, end = self._view, self._script_start, self._script_end
+        size = end - start
+
+        if (size == 25 and view[start:start + 3] == P2PKH_PREFIX and
+                view[end - 2:end] == P2PKH_SUFFIX):
+            return P2PKH
+        elif (size == 23 and view[start:start + 2] == P2SH_PREFIX and
+                view[end - 1:end] == P2SH_SUFFIX):
+            return P2SH
+        elif size and view[start] == OP_RETURN[0]:
+            return NULL_DATA
+
+        return NONSTANDARD
+
+    def hash160_view(self):
+        """The hash paid to, as a slice of the transaction bytes without
+        copying, or ``None`` for scripts other than P2PKH and P2SH.
+
+        :rtype: ``memoryview``
+        """
+        script_type = self.type
+
+        if script_type == P2PKH:
+            return self._view[self._script_start + 3:self._script_start + 23]
+        elif script_type == P2SH:
+            return self._view[self._script_start + 2:self._script_start + 22]
+
+        return None
+
+    @property
+    def hash160(self):
+        """The hash paid to, or ``None`` for scripts other than P2PKH and P2SH.
+
+        :rtype: ``bytes``
+        """
+        hash160 = self.hash160_view()
+        return None if hash160 is None else hash160.tobytes()
+
+    @property
+    def address(self):
+        """The mainnet cash address paid to, or ``None``."""
+        hash160 = self.hash160_view()
+
+        if hash160 is None:
+            return None
+
+        version = CASHADDR_P2PKH if self.type == P2PKH else CASHADDR_P2SH
+        return hash160_to_cashaddr(hash160.tobytes(), version=version)
+
+    @property
+    def op_return(self):
+        """The data pushed after ``OP_RETURN`` in hex, or ``None``."""
+        if self.type != NULL_DATA:
+            return None
+
+        start = self._script_start + 1
+        if start < self._script_end:
+            opcode = self._view[start]
+            # Skip the push opcode and any length following it.
+            start += PUSHDATA_LENGTH_SIZES.get(opcode, 0) + 1 if opcode <= OP_PUSHDATA4[0] else 0
+
+        return bytes_to_hex(self._view[start:self._script_end].tobytes())
+
+    def message(self):
+        """See :meth:`TxPart.message <bitcoinpython.network.transaction.TxPart.message>`."""
+        op_return = self.op_return
+        return None if op_return is None else bytearray.fromhex(op_return).decode('utf-8')
+
+    def to_part(self):
+        """:rtype: :class:`~bitcoinpython.network.transaction.TxPart`"""
+        part = TxPart(self.address, self.amount)
+        part.op_return = self.op_return
+        return part
+
+    def __repr__(self):
+        return 'RawTxOut({}, {})'.format(self.address or self.type, self.amount)
+
+
+class RawTransaction:
+    """A transaction parsed from its raw bytes. Only the positions of its
+    fields are found up front; scripts, amounts and the ID are read from the
+    underlying buffer when first accessed, so parsing many transactions
+    costs little more than walking their lengths.
+
+    Use :func:`parse_transaction` to create one.
+    """
+    __slots__ = ('_view', 'version', 'inputs', 'outputs', 'locktime', 'block', '_hash')
+
+    def __init__(self, view, version, inputs, outputs, locktime, block=None):
+        self._view = view
+        self.version = version
+        self.inputs = inputs
+        self.outputs = outputs
+        self.locktime = locktime
+        self.block = block
+        self._hash = None
+
+    @property
+    def hash(self):
+        """The double SHA-256 of the transaction, i.e. its ID in internal
+        byte order.
+
+        :rtype: ``bytes``
+        """
+        if self._hash is None:
+            self._hash = double_sha256(self._view)
+        return self._hash
+
+    @property
+    def txid(self):
+        return bytes_to_hex(self.hash[::-1])
+
+    @property
+    def size(self):
+        return len(self._view)
+
+    def to_bytes(self):
+        return self._view.tobytes()
+
+    def to_hex(self):
+        return bytes_to_hex(self._view)
+
+    def __len__(self):
+        return len(self._view)
+
+    def __repr__(self):
+        return 'RawTransaction({}, {} input{}, {} output{})'.format(
+            self.txid, len(self.inputs), '' if len(self.inputs) == 1 else 's',
+            len(self.outputs), '' if len(self.outputs) == 1 else 's')
+
+
+def read_transaction(view, offset=0):
+    """Parses the transaction starting at ``offset`` of a buffer holding it,
+    e.g. within a block.
+
+    :param view: The buffer.
+    :type view: ``memoryview``
+    :param offset: Where the transaction starts.
+    :type offset: ``int``
+    :raises ValueError: If the transaction is truncated.
+    :returns: The transaction and the offset past it.
+    :rtype: ``tuple``
+    """
+    try:
+        start = offset
+        version = int.from_bytes(view[offset:offset + 4], 'little')
+
+        n_inputs, offset = read_varint(view, offset + 4)
+        inputs = []
+        for _ in range(n_inputs):
+            script_len, script_start = read_varint(view, offset + 36)
+            script_end = script_start + script_len
+            inputs.append(RawTxIn(view, offset, script_start, script_end))
+            offset = script_end + 4
+
+        n_outputs, offset = read_varint(view, offset)
+        outputs = []
+        for _ in range(n_outputs):
+            script_len, script_start = read_varint(view, offset + 8)
+            script_end = script_start + script_len
+            outputs.append(RawTxOut(view, offset, script_start, script_end))
+            offset = script_end
+
+        locktime_end = offset + 4
+    except IndexError:
+        raise ValueError('Truncated transaction.')
+
+    if locktime_end > len(view):
+        raise ValueError('Truncated transaction.')
+
+    locktime = int.from_bytes(view[offset:locktime_end], 'little')
+    tx = RawTransaction(view[start:locktime_end], version, inputs, outputs, locktime)
+
+    return tx, locktime_end
+
+
+def parse_transaction(tx, block=None):
+    """Parses a raw transaction, such as one from
+    :meth:`~bitcoinpython.network.NetworkAPI.get_raw_transaction` or
+    :meth:`~bitcoinpython.PrivateKey.create_transaction`.
+
+    :param tx: The transaction in hex or as a bytes-like object.
+    :type tx: ``str`` or ``bytes``
+    :param block: The block the transaction is in, if known.
+    :raises ValueError: If ``tx`` is not exactly one transaction.
+    :rtype: :class:`RawTransaction`
+    """
+    if isinstance(tx, str):
+        tx = hex_to_bytes(tx)
+
+    view = memoryview(tx)
+    if view.format != 'B' or view.ndim != 1:
+        view = view.cast('B')
+
+    tx, end = read_transaction(view)
+    tx.block = block
+
+    if end != len(view):
+        raise ValueError('{} bytes left after the transaction.'.format(len(view) - end))
+
+    return tx
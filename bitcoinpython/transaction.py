@@ -1,14 +1,17 @@
 import logging
 from collections import namedtuple
+from hashlib import sha256 as _sha256
+from multiprocessing import Pool
 
 from cashaddress import convert as cashaddress
 
-from bitcoinpython.crypto import double_sha256, sha256
+from bitcoinpython.crypto import ECPrivateKey, double_sha256
 from bitcoinpython.exceptions import InsufficientFunds
 from bitcoinpython.format import address_to_public_key_hash
+from bitcoinpython.network.cache import LRUCache
 from bitcoinpython.network.rates import currency_to_satoshi_cached
 from bitcoinpython.utils import (
-    bytes_to_hex, chunk_data, hex_to_bytes, int_to_unknown_bytes, int_to_varint
+    bytes_to_hex, chunk_data, get_core_count, hex_to_bytes, int_to_varint
 )
 
 VERSION_1 = 0x01.to_bytes(4, byteorder='little')
@@ -28,6 +31,7 @@ OP_0 = b'\x00'
 OP_CHECKLOCKTIMEVERIFY = b'\xb1'
 OP_CHECKSIG = b'\xac'
 OP_DUP = b'v'
+OP_EQUAL = b'\x87'
 OP_EQUALVERIFY = b'\x88'
 OP_HASH160 = b'\xa9'
 OP_PUSH_20 = b'\x14'
@@ -38,6 +42,34 @@ OP_PUSHDATA4 = b'\x4e'
 
 MESSAGE_LIMIT = 220
 
+# A DER signature with a low S value is at most 71 bytes, plus the sighash
+# type byte.
+MAX_SIGNATURE_SIZE = 72
+P2PKH_SCRIPT_SIZE = 25
+P2SH_SCRIPT_SIZE = 23
+
+# Transactions with more inputs than this are signed in a process pool
+# when more than one core is requested.
+PARALLEL_SIGNING_THRESHOLD = 500
+
+# Distinct addresses whose locking scripts are kept, so repeated payees
+# are only decoded once.
+SCRIPT_CACHE_SIZE = 4096
+SCRIPT_CACHE = LRUCache(SCRIPT_CACHE_SIZE)
+
+_signing_worker = {}
+
+
+def set_parallel_signing_threshold(n_inputs):
+    global PARALLEL_SIGNING_THRESHOLD
+    PARALLEL_SIGNING_THRESHOLD = n_inputs
+
+
+def set_script_cache_size(size):
+    """Sets how many compiled address scripts are kept. 0 disables the cache."""
+    global SCRIPT_CACHE
+    SCRIPT_CACHE = LRUCache(size) if size else None
+
 
 class TxIn:
     __slots__ = ('script', 'script_len', 'txid', 'txindex', 'amount')
@@ -69,8 +101,130 @@ class TxIn:
 Output = namedtuple('Output', ('address', 'amount', 'currency'))
 
 
-def calc_txid(tx_hex):
-    return bytes_to_hex(double_sha256(hex_to_bytes(tx_hex))[::-1])
+def calc_txid(tx):
+    """The ID of a transaction given in hex or as a bytes-like object."""
+    if isinstance(tx, str):
+        tx = hex_to_bytes(tx)
+    return bytes_to_hex(double_sha256(tx)[::-1])
+
+
+def varint_size(num):
+    if num < 253:
+        return 1
+    elif num <= 0xffff:
+        return 3
+    elif num <= 0xffffffff:
+        return 5
+    return 9
+
+
+def input_size(compressed=True, signature_size=MAX_SIGNATURE_SIZE):
+    """The size of an input spending a P2PKH output."""
+    script_size = 1 + signature_size + 1 + (33 if compressed else 65)
+    # txid, txindex, script and sequence
+    return 32 + 4 + varint_size(script_size) + script_size + 4
+
+
+def output_size(script_size):
+    # amount and script
+    return 8 + varint_size(script_size) + script_size
+
+
+P2PKH_OUTPUT_SIZE = output_size(P2PKH_SCRIPT_SIZE)
+P2SH_OUTPUT_SIZE = output_size(P2SH_SCRIPT_SIZE)
+
+
+def compile_script(address):
+    """The locking script paying to a P2PKH or P2SH cash address."""
+    payload, version = address_to_public_key_hash(address)
+
+    if "P2PKH" in version:
+        return OP_DUP + OP_HASH160 + OP_PUSH_20 + payload + OP_EQUALVERIFY + OP_CHECKSIG
+    elif "P2SH" in version:
+        return OP_HASH160 + OP_PUSH_20 + payload + OP_EQUAL
+
+    raise ValueError('{} addresses are not supported.'.format(version))
+
+
+def address_to_script(address):
+    """Like :func:`compile_script`, but looks the script up in
+    ``SCRIPT_CACHE`` first."""
+    cache = SCRIPT_CACHE
+
+    if cache is None:
+        return compile_script(address)
+
+    try:
+        return cache.get(address)
+    except KeyError:
+        script = compile_script(address)
+        cache.set(address, script)
+        return script
+
+
+def addresses_to_scripts(addresses):
+    """The locking scripts paying to ``addresses``, in order, decoding each
+    distinct address at most once.
+
+    :rtype: ``list`` of ``bytes``
+    """
+    scripts = {}
+    for address in addresses:
+        if address not in scripts:
+            scripts[address] = address_to_script(address)
+    return [scripts[address] for address in addresses]
+
+
+def address_output_size(address):
+    """The size of an output paying to a cash address."""
+    return output_size(len(address_to_script(address)))
+
+
+class TxSize:
+    """The serialized size of a transaction, kept up to date in constant
+    time as inputs and outputs are added, so that many candidate input sets
+    can be priced cheaply. Input sizes are upper bounds, as the length of
+    each signature is only known once signed.
+    """
+    __slots__ = ('n_inputs', 'inputs_size', 'n_outputs', 'outputs_size')
+
+    def __init__(self, n_inputs=0, inputs_size=0, n_outputs=0, outputs_size=0):
+        self.n_inputs = n_inputs
+        self.inputs_size = inputs_size
+        self.n_outputs = n_outputs
+        self.outputs_size = outputs_size
+
+    def add_inputs(self, n=1, compressed=True):
+        self.n_inputs += n
+        self.inputs_size += n * input_size(compressed)
+
+    def add_output(self, size=P2PKH_OUTPUT_SIZE):
+        self.n_outputs += 1
+        self.outputs_size += size
+
+    def add_address_output(self, address):
+        self.add_output(address_output_size(address))
+
+    def add_message(self, message, custom_pushdata=False):
+        self.add_output(get_op_return_size(message, custom_pushdata=custom_pushdata))
+
+    def copy(self):
+        return TxSize(self.n_inputs, self.inputs_size, self.n_outputs, self.outputs_size)
+
+    def size(self, extra_inputs=0, extra_inputs_size=0, extra_outputs=0, extra_outputs_size=0):
+        """The size in bytes, optionally as if more inputs or outputs were
+        added, without adding them."""
+        n_inputs = self.n_inputs + extra_inputs
+        n_outputs = self.n_outputs + extra_outputs
+        return (
+            len(VERSION_1) +
+            varint_size(n_inputs) + self.inputs_size + extra_inputs_size +
+            varint_size(n_outputs) + self.outputs_size + extra_outputs_size +
+            len(LOCK_TIME)
+        )
+
+    def __len__(self):
+        return self.size()
 
 
 def estimate_tx_fee(n_in, n_out, satoshis, compressed, op_return_size=0):
@@ -78,15 +232,11 @@ def estimate_tx_fee(n_in, n_out, satoshis, compressed, op_return_size=0):
     if not satoshis:
         return 0
 
-    estimated_size = (
-        4 +  # version
-        n_in * (148 if compressed else 180)
-        + len(int_to_unknown_bytes(n_in, byteorder='little'))
-        + n_out * 34  # excluding op_return outputs, dealt with separately
-        + len(int_to_unknown_bytes(n_out, byteorder='little'))
-        + op_return_size  # grand total size of op_return outputs(s) and related field(s)
-        + 4  # time lock
-    )
+    estimated_size = TxSize(
+        n_in, n_in * input_size(compressed),
+        # excluding op_return outputs, dealt with separately
+        n_out, n_out * P2PKH_OUTPUT_SIZE
+    ).size() + op_return_size  # grand total size of op_return outputs(s) and related field(s)
 
     estimated_fee = estimated_size * satoshis
 
@@ -129,11 +279,14 @@ def get_op_pushdata_code(dest):
         return OP_PUSHDATA4 + length_data.to_bytes(4, byteorder='little')  # OP_PUSHDATA4 format
 
 
-def sanitize_tx_data(unspents, outputs, fee, leftover, combine=True, message=None, compressed=True, custom_pushdata=False):
+def sanitize_tx_data(unspents, outputs, fee, leftover, combine=True, message=None, compressed=True, custom_pushdata=False,
+                     strategy=None):
     """
     sanitize_tx_data()
 
-    fee is in satoshis per byte.
+    fee is in satoshis per byte. If a coin selection ``strategy`` is given,
+    see :func:`~bitcoinpython.coinselect.select_coins`, it picks the
+    unspents instead of ``combine``.
     """
 
     outputs = outputs.copy()
@@ -147,7 +300,6 @@ def sanitize_tx_data(unspents, outputs, fee, leftover, combine=True, message=Non
 
     # Temporary storage so all outputs precede messages.
     messages = []
-    total_op_return_size = 0
 
     if message and (custom_pushdata is False):
         try:
@@ -159,7 +311,6 @@ def sanitize_tx_data(unspents, outputs, fee, leftover, combine=True, message=Non
 
         for message in message_chunks:
             messages.append((message, 0))
-            total_op_return_size += get_op_return_size(message, custom_pushdata=False)
 
     elif message and (custom_pushdata is True):
         if (len(message) >= 220):
@@ -167,17 +318,42 @@ def sanitize_tx_data(unspents, outputs, fee, leftover, combine=True, message=Non
             raise ValueError("Currently cannot exceed 220 bytes with custom_pushdata.")
         else:
             messages.append((message, 0))
-            total_op_return_size += get_op_return_size(message, custom_pushdata=True)
 
 
-    # Include return address in fee estimate.
+    # The exact size of everything but the inputs, then of the return
+    # output, so each candidate set of inputs is priced in constant time.
+    tx_size = TxSize()
+    for dest, _ in outputs:
+        tx_size.add_address_output(dest)
+    for message, _ in messages:
+        tx_size.add_message(message, custom_pushdata=custom_pushdata)
+    change_size = address_output_size(leftover)
+
     total_in = 0
-    num_outputs = len(outputs) + 1
     sum_outputs = sum(out[1] for out in outputs)
 
+    if strategy is not None:
+        # Imported here as coinselect builds on this module.
+        from bitcoinpython.coinselect import FeeModel, select_coins
+
+        model = FeeModel(tx_size, fee, compressed, change_size)
+        unspents, change = select_coins(unspents, sum_outputs, model, strategy)
+
+        if change:
+            outputs.append((leftover, change))
+        outputs.extend(messages)
+
+        return unspents, outputs
+
+    per_input = input_size(compressed)
+
+    def calculate_fee(n_in):
+        # Include return address in fee estimate.
+        return tx_size.size(n_in, n_in * per_input, 1, change_size) * fee
+
     if combine:
         # calculated_fee is in total satoshis.
-        calculated_fee = estimate_tx_fee(len(unspents), num_outputs, fee, compressed, total_op_return_size)
+        calculated_fee = calculate_fee(len(unspents))
         total_out = sum_outputs + calculated_fee
         unspents = unspents.copy()
         total_in += sum(unspent.amount for unspent in unspents)
@@ -187,9 +363,9 @@ def sanitize_tx_data(unspents, outputs, fee, leftover, combine=True, message=Non
         final_unspents = []
         for index in range(len(unspents)):
             total_in += unspents[len(unspents) - 1 - index].amount
-            calculated_fee = estimate_tx_fee(len(final_unspents), num_outputs, fee, compressed, total_op_return_size)
-            total_out = sum_outputs + calculated_fee
             final_unspents.append(unspents[len(unspents) - 1 - index])
+            calculated_fee = calculate_fee(len(final_unspents))
+            total_out = sum_outputs + calculated_fee
             if total_in >= total_out:
                 break
 
@@ -208,29 +384,40 @@ def sanitize_tx_data(unspents, outputs, fee, leftover, combine=True, message=Non
     return unspents, outputs
 
 
+def _write_parts(view, offset, parts):
+    """Copies ``parts`` into the buffer behind ``view`` one after another,
+    returning the offset past the last one."""
+    for part in parts:
+        end = offset + len(part)
+        view[offset:end] = part
+        offset = end
+    return offset
+
+
 def construct_output_block(outputs, custom_pushdata=False):
+    """Serializes ``outputs`` into a single buffer allocated at its final
+    size.
 
-    output_block = b''
+    :rtype: ``bytearray``
+    """
+    fields = []
+    size = 0
+    scripts = iter(addresses_to_scripts([dest for dest, amount in outputs if amount]))
 
     for data in outputs:
         dest, amount = data
 
         # Real recipient
         if amount:
-            script = address_to_public_key_hash(dest)[0]
-            version = address_to_public_key_hash(dest)[1]
-            if "P2PKH" in version:
-                script = (OP_DUP + OP_HASH160 + OP_PUSH_20 + script + OP_EQUALVERIFY + OP_CHECKSIG)
-            elif "P2SH" in version:
-                script = (OP_HASH160 + b'\x14' + script + b'\x87')
-            output_block += amount.to_bytes(8, byteorder='little')
+            script = next(scripts)
+            value = amount.to_bytes(8, byteorder='little')
 
         # Blockchain storage
         else:
             if custom_pushdata is False:
                 script = OP_RETURN + get_op_pushdata_code(dest) + dest
 
-                output_block += b'\x00\x00\x00\x00\x00\x00\x00\x00'
+                value = b'\x00\x00\x00\x00\x00\x00\x00\x00'
 
             elif custom_pushdata is True:
                 # manual control over number of bytes in each batch of pushdata
@@ -239,47 +426,169 @@ def construct_output_block(outputs, custom_pushdata=False):
                 else:
                     script = (OP_RETURN + dest)
 
-                output_block += b'\x00\x00\x00\x00\x00\x00\x00\x00'
+                value = b'\x00\x00\x00\x00\x00\x00\x00\x00'
 
-        # Script length in wiki is "Var_int" but there's a note of "modern BitcoinQT" using a more compact "CVarInt"
-        # CVarInt is what I believe we have here - No changes made. If incorrect - only breaks if 220 byte limit is increased.
-        output_block += int_to_unknown_bytes(len(script), byteorder='little')
-        output_block += script
+        script_len = int_to_varint(len(script))
+        fields.append((value, script_len, script))
+        size += len(value) + len(script_len) + len(script)
+
+    output_block = bytearray(size)
+    view = memoryview(output_block)
+    offset = 0
+
+    for parts in fields:
+        offset = _write_parts(view, offset, parts)
 
     return output_block
 
 
-def construct_input_block(inputs):
+def input_block_size(inputs):
+    # txid (32) + txindex (4) + sequence (4) per input.
+    return sum(40 + len(txin.script_len) + len(txin.script) for txin in inputs)
 
-    input_block = b''
+
+def write_input_block(view, offset, inputs):
+    """Writes ``inputs`` into the buffer behind ``view`` at ``offset``,
+    returning the offset past the last one."""
     sequence = SEQUENCE
 
     for txin in inputs:
-        input_block += (
-            txin.txid +
-            txin.txindex +
-            txin.script_len +
-            txin.script +
-            sequence
+        offset = _write_parts(
+            view, offset, (txin.txid, txin.txindex, txin.script_len, txin.script, sequence)
         )
 
+    return offset
+
+
+def construct_input_block(inputs):
+    """Serializes ``inputs`` into a single buffer allocated at its final
+    size.
+
+    :rtype: ``bytearray``
+    """
+    input_block = bytearray(input_block_size(inputs))
+    write_input_block(memoryview(input_block), 0, inputs)
     return input_block
 
 
-def create_p2pkh_transaction(private_key, unspents, outputs, custom_pushdata=False):
+def construct_sighash_parts(inputs, output_block, scriptcode):
+    """Splits the BIP-143 preimages of ``inputs`` into the parts shared by
+    every input and the fields unique to each one.
 
-    public_key = private_key.public_key
-    public_key_len = len(public_key).to_bytes(1, byteorder='little')
+    :returns: ``(prefix, suffix, input_fields)`` where the preimage of input
+              ``i`` is ``prefix + input_fields[i] + suffix``.
+    """
+    hashPrevouts = double_sha256(b''.join([i.txid + i.txindex for i in inputs]))
+    hashSequence = double_sha256(SEQUENCE * len(inputs))
+    hashOutputs = double_sha256(output_block)
+
+    prefix = VERSION_1 + hashPrevouts + hashSequence
+    suffix = hashOutputs + LOCK_TIME + HASH_TYPE
+
+    # scriptCode_len is part of the script.
+    scriptcode = int_to_varint(len(scriptcode)) + scriptcode
+    input_fields = [
+        txin.txid + txin.txindex + scriptcode + txin.amount + SEQUENCE
+        for txin in inputs
+    ]
+
+    return prefix, suffix, input_fields
+
+
+def calc_sighashes(prefix, suffix, input_fields):
+    """Hashes the preimage of every input, absorbing the shared ``prefix``
+    once and resuming from a copy of that hash state for each input.
+    """
+    midstate = _sha256(prefix)
+    sighashes = []
+
+    for fields in input_fields:
+        state = midstate.copy()
+        state.update(fields)
+        state.update(suffix)
+        sighashes.append(state.digest())  # BIP-143: Used for Bitcoin Cash
+
+    return sighashes
+
+
+def _init_signing_worker(secret, prefix, suffix):  # pragma: no cover
+    _signing_worker['sign'] = ECPrivateKey(secret).sign
+    _signing_worker['prefix'] = prefix
+    _signing_worker['suffix'] = suffix
+
+
+def _sign_input_fields(input_fields):  # pragma: no cover
+    sign = _signing_worker['sign']
+    sighashes = calc_sighashes(_signing_worker['prefix'], _signing_worker['suffix'], input_fields)
+    return [sign(sighash) for sighash in sighashes]
+
+
+def sign_sighash_parts(secret, prefix, suffix, input_fields, cores=1):
+    """Hashes and signs the preimage of every input, spreading the work over
+    a pool of ``cores`` processes. Only the secret and the preimage parts are
+    sent to the workers.
+
+    :returns: The DER signatures, in input order.
+    """
+    cores = get_core_count(cores)
+
+    if cores == 1:
+        sign = ECPrivateKey(secret).sign
+        return [sign(sighash) for sighash in calc_sighashes(prefix, suffix, input_fields)]
+
+    # A few chunks per worker keeps them busy if some finish early.
+    chunk_size = -(-len(input_fields) // (cores * 4)) or 1
+
+    with Pool(cores, initializer=_init_signing_worker, initargs=(secret, prefix, suffix)) as pool:
+        chunks = pool.map(_sign_input_fields, chunk_data(input_fields, chunk_size))
+
+    return [signature for chunk in chunks for signature in chunk]
+
+
+def construct_script_sig(signature, public_key):
+    # signature = signature + b'\x01'
+    signature += b'\x41'
+    return (
+        len(signature).to_bytes(1, byteorder='little') +
+        signature +
+        len(public_key).to_bytes(1, byteorder='little') +
+        public_key
+    )
+
+
+def serialize_transaction(inputs, output_block, n_outputs):
+    """Writes a transaction into a single buffer allocated at its final size.
+
+    :rtype: ``bytearray``
+    """
+    input_count = int_to_varint(len(inputs))
+    output_count = int_to_varint(n_outputs)
+
+    size = (
+        len(VERSION_1) +
+        len(input_count) +
+        input_block_size(inputs) +
+        len(output_count) +
+        len(output_block) +
+        len(LOCK_TIME)
+    )
+    buffer = bytearray(size)
+    view = memoryview(buffer)
 
-    scriptCode = private_key.scriptcode
-    scriptCode_len = int_to_varint(len(scriptCode))
+    offset = _write_parts(view, 0, (VERSION_1, input_count))
+    offset = write_input_block(view, offset, inputs)
+    _write_parts(view, offset, (output_count, output_block, LOCK_TIME))
 
-    version = VERSION_1
-    lock_time = LOCK_TIME
-    # sequence = SEQUENCE
-    hash_type = HASH_TYPE
-    input_count = int_to_unknown_bytes(len(unspents), byteorder='little')
-    output_count = int_to_unknown_bytes(len(outputs), byteorder='little')
+    return buffer
+
+
+def build_p2pkh_transaction(private_key, unspents, outputs, custom_pushdata=False, cores=1):
+    """Like :func:`create_p2pkh_transaction`, but returns the raw transaction
+    without hex encoding it, for hashing or writing out directly.
+
+    :rtype: ``memoryview``
+    """
+    public_key = private_key.public_key
 
     output_block = construct_output_block(outputs, custom_pushdata=custom_pushdata)
 
@@ -287,53 +596,34 @@ def create_p2pkh_transaction(private_key, unspents, outputs, custom_pushdata=Fal
     inputs = []
     for unspent in unspents:
         script = hex_to_bytes(unspent.script)
-        script_len = int_to_unknown_bytes(len(script), byteorder='little')
+        script_len = int_to_varint(len(script))
         txid = hex_to_bytes(unspent.txid)[::-1]
         txindex = unspent.txindex.to_bytes(4, byteorder='little')
         amount = unspent.amount.to_bytes(8, byteorder='little')
 
         inputs.append(TxIn(script, script_len, txid, txindex, amount))
 
-    hashPrevouts = double_sha256(b''.join([i.txid+i.txindex for i in inputs]))
-    hashSequence = double_sha256(b''.join([SEQUENCE for i in inputs]))
-    hashOutputs = double_sha256(output_block)
+    prefix, suffix, input_fields = construct_sighash_parts(
+        inputs, output_block, private_key.scriptcode
+    )
 
-    # scriptCode_len is part of the script.
-    for i, txin in enumerate(inputs):
-        to_be_hashed = (
-            version +
-            hashPrevouts +
-            hashSequence +
-            txin.txid +
-            txin.txindex +
-            scriptCode_len +
-            scriptCode +
-            txin.amount +
-            SEQUENCE +
-            hashOutputs +
-            lock_time +
-            hash_type
+    if cores != 1 and len(inputs) > PARALLEL_SIGNING_THRESHOLD:
+        signatures = sign_sighash_parts(
+            private_key.to_bytes(), prefix, suffix, input_fields, cores=cores
         )
-        hashed = sha256(to_be_hashed)  # BIP-143: Used for Bitcoin Cash
+    else:
+        sign = private_key.sign
+        signatures = [sign(sighash) for sighash in calc_sighashes(prefix, suffix, input_fields)]
 
-        # signature = private_key.sign(hashed) + b'\x01'
-        signature = private_key.sign(hashed) + b'\x41'
+    for txin, signature in zip(inputs, signatures):
+        script_sig = construct_script_sig(signature, public_key)
 
-        script_sig = (
-            len(signature).to_bytes(1, byteorder='little') +
-            signature +
-            public_key_len +
-            public_key
-        )
+        txin.script = script_sig
+        txin.script_len = int_to_varint(len(script_sig))
 
-        inputs[i].script = script_sig
-        inputs[i].script_len = int_to_unknown_bytes(len(script_sig), byteorder='little')
+    return memoryview(serialize_transaction(inputs, output_block, len(outputs)))
 
-    return bytes_to_hex(
-        version +
-        input_count +
-        construct_input_block(inputs) +
-        output_count +
-        output_block +
-        lock_time
-    )
+
+def create_p2pkh_transaction(private_key, unspents, outputs, custom_pushdata=False, cores=1):
+    return bytes_to_hex(build_p2pkh_transaction(private_key, unspents, outputs,
+                                                custom_pushdata=custom_pushdata, cores=cores))
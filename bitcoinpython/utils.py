@@ -1,5 +1,6 @@
 import decimal
 from binascii import hexlify
+from multiprocessing import cpu_count
 
 
 class Decimal(decimal.Decimal):
@@ -52,3 +53,16 @@ def int_to_varint(val):
         return b'\xfe'+val.to_bytes(4, 'little')
     else:
         return b'\xff'+val.to_bytes(8, 'little')
+
+
+def get_core_count(cores):
+    """Resolves ``'all'`` or a number of cores to the number of worker
+    processes to use, falling back to 1 for out of range values."""
+    available_cores = cpu_count()
+
+    if cores == 'all':
+        return available_cores
+    elif 0 < int(cores) <= available_cores:
+        return int(cores)
+    else:
+        return 1
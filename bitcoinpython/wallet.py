@@ -1,17 +1,31 @@
 import json
+from collections import namedtuple
+from multiprocessing import Pool
+from time import monotonic
 
-from bitcoinpython.crypto import ECPrivateKey
+from coincurve import Context
+
+from bitcoinpython import keycache
+from bitcoinpython.crypto import ECPrivateKey, ripemd160_sha256
 from bitcoinpython.curve import Point
 from bitcoinpython.format import (
-    bytes_to_wif, public_key_to_address, public_key_to_coords, wif_to_bytes,
-    address_to_public_key_hash
+    BULK_CHUNK_SIZE, addresses_from_public_keys, bytes_to_wif, public_key_to_address,
+    public_key_to_coords, wif_to_bytes
 )
 from bitcoinpython.network import NetworkAPI, get_fee, satoshi_to_currency_cached
-from bitcoinpython.network.meta import Unspent
+from bitcoinpython.network.meta import Unspent, UnspentIndex
 from bitcoinpython.transaction import (
-    calc_txid, create_p2pkh_transaction, sanitize_tx_data,
-    OP_CHECKSIG, OP_DUP, OP_EQUALVERIFY, OP_HASH160, OP_PUSH_20
-    )
+    build_p2pkh_transaction, calc_txid, create_p2pkh_transaction, sanitize_tx_data
+)
+from bitcoinpython.utils import bytes_to_hex, chunk_data, get_core_count
+
+# Seconds before unspents reserved by a transaction that was neither
+# broadcast nor released become available again.
+RESERVATION_TTL = 600
+
+# A private key with its public key derived elsewhere, e.g. by a worker
+# process, so that it need not be derived again.
+DerivedKey = namedtuple('DerivedKey', ('secret', 'public_key'))
 
 
 def wif_to_key(wif):
@@ -24,6 +38,90 @@ def wif_to_key(wif):
             return PrivateKey(wif)
 
 
+def _bulk_key(ec_key, compressed, address):
+    key = PrivateKey(ec_key)
+    if not compressed:
+        key._public_key = ec_key.public_key.format(compressed=False)
+    key._address = address
+    return key
+
+
+def _derive_wifs(wifs, context):
+    decoded = [wif_to_bytes(wif)[:2] for wif in wifs]
+    ec_keys = [ECPrivateKey(secret, context=context) for secret, _ in decoded]
+    addresses = addresses_from_public_keys(
+        ec_key.public_key.format(compressed=compressed)
+        for ec_key, (_, compressed) in zip(ec_keys, decoded)
+    )
+    return ec_keys, [compressed for _, compressed in decoded], addresses
+
+
+def _derive_wifs_worker(wifs):  # pragma: no cover
+    ec_keys, compression, addresses = _derive_wifs(wifs, Context())
+    return [(ec_key.secret, ec_key.public_key.format(compressed=compressed), address)
+            for ec_key, compressed, address in zip(ec_keys, compression, addresses)]
+
+
+def _derived_key(secret, public_key, address):
+    key = PrivateKey(DerivedKey(secret, public_key))
+    key._address = address
+    return key
+
+
+def keys_from_wifs(wifs, cores=1, chunk_size=BULK_CHUNK_SIZE):
+    """Loads many private keys at once, deriving their addresses in bulk.
+    As with :class:`~bitcoinpython.PrivateKey`, the WIF compression flag is
+    adhered to but the version byte is disregarded.
+
+    :param wifs: Private keys serialized to the Wallet Import Format.
+    :type wifs: iterable of ``str``
+    :param cores: The number of processes to decode and derive with, or
+                  ``'all'``.
+    :type cores: ``int`` or ``str``
+    :param chunk_size: The number of keys handled per chunk.
+    :type chunk_size: ``int``
+    :rtype: ``list`` of :class:`~bitcoinpython.PrivateKey`
+    """
+    context = Context()
+    chunks = chunk_data(list(wifs), chunk_size)
+    cores = get_core_count(cores)
+    keys = []
+
+    if cores == 1:
+        for chunk in chunks:
+            keys.extend(map(_bulk_key, *_derive_wifs(chunk, context)))
+        return keys
+
+    with Pool(cores) as pool:
+        for derived in pool.imap(_derive_wifs_worker, chunks):
+            keys.extend(_derived_key(*fields) for fields in derived)
+
+    return keys
+
+
+def get_unspents_many(keys):
+    """Fetches the unspent transaction outputs of many private keys with
+    batched lookups, updating each as
+    :func:`~bitcoinpython.PrivateKey.get_unspents` would.
+
+    :param keys: The private keys to refresh.
+    :type keys: iterable of :class:`~bitcoinpython.PrivateKey`
+    :raises ConnectionError: If all API services fail for every key.
+    :returns: The unspents of every key's address answered for. Keys whose
+              lookup failed are left as they were, and their addresses
+              listed in ``failed``.
+    :rtype: :class:`~bitcoinpython.network.LookupResults`
+    """
+    keys = list(keys)
+    unspents = NetworkAPI.get_unspent_many([key.address for key in keys])
+
+    for key in keys:
+        if key.address in unspents:
+            key._set_unspents(unspents[key.address])
+
+    return unspents
+
+
 class BaseKey:
     """This class represents a point on the elliptic curve secp256k1 and
     provides all necessary cryptographic functionality. You shouldn't use
@@ -37,21 +135,37 @@ class BaseKey:
     :raises TypeError: If ``wif`` is not a ``str``.
     """
     def __init__(self, wif=None):
+        self._public_point = None
+
+        if isinstance(wif, DerivedKey):
+            # The coincurve key is only created once needed, as that
+            # multiplies the curve point again.
+            self._secret = wif.secret
+            self._ec_key = None
+            self._public_key = wif.public_key
+            return
+
         if wif:
             if isinstance(wif, str):
                 private_key_bytes, compressed, _ = wif_to_bytes(wif)
-                self._pk = ECPrivateKey(private_key_bytes)
+                self._ec_key = ECPrivateKey(private_key_bytes)
             elif isinstance(wif, ECPrivateKey):
-                self._pk = wif
+                self._ec_key = wif
                 compressed = True
             else:
                 raise TypeError('Wallet Import Format must be a string.')
         else:
-            self._pk = ECPrivateKey()
+            self._ec_key = ECPrivateKey()
             compressed = True
 
-        self._public_point = None
-        self._public_key = self._pk.public_key.format(compressed=compressed)
+        self._secret = self._ec_key.secret
+        self._public_key = self._ec_key.public_key.format(compressed=compressed)
+
+    @property
+    def _pk(self):
+        if self._ec_key is None:
+            self._ec_key = ECPrivateKey(self._secret)
+        return self._ec_key
 
     @property
     def public_key(self):
@@ -93,7 +207,7 @@ class BaseKey:
 
     def to_bytes(self):
         """:rtype: ``bytes``"""
-        return self._pk.secret
+        return self._secret
 
     def to_der(self):
         """:rtype: ``bytes``"""
@@ -140,24 +254,39 @@ class PrivateKey(BaseKey):
         self.unspents = []
         self.transactions = []
 
+        # Unspents reserved by transactions built but not yet broadcast
+        self.utxos = UnspentIndex()
+        self._reservations = {}
+
     @property
     def address(self):
         """The public address you share with others to receive funds."""
         if self._address is None:
-            self._address = public_key_to_address(self._public_key, version='main')
+            if keycache.DERIVATION_CACHE is None:
+                self._address = public_key_to_address(self._public_key, version='main')
+            else:
+                self._load_derivation()
 
         return self._address
 
     @property
     def scriptcode(self):
-        self._scriptcode = (OP_DUP + OP_HASH160 + OP_PUSH_20 +
-                            address_to_public_key_hash(self.address)[0] +
-                            OP_EQUALVERIFY + OP_CHECKSIG)
+        if self._scriptcode is None:
+            if keycache.DERIVATION_CACHE is None:
+                self._scriptcode = keycache.hash160_to_scriptcode(ripemd160_sha256(self._public_key))
+            else:
+                self._load_derivation()
+
         return self._scriptcode
 
+    def _load_derivation(self):
+        derivation = keycache.DERIVATION_CACHE.get(self._public_key)
+        self._address = derivation.address
+        self._scriptcode = derivation.scriptcode
+
     def to_wif(self):
         return bytes_to_wif(
-            self._pk.secret,
+            self._secret,
             version='main',
             compressed=self.is_compressed()
         )
@@ -188,10 +317,52 @@ class PrivateKey(BaseKey):
 
         :rtype: ``list`` of :class:`~bitcoinpython.network.meta.Unspent`
         """
-        self.unspents[:] = NetworkAPI.get_unspent(self.address)
-        self.balance = sum(unspent.amount for unspent in self.unspents)
+        return self._set_unspents(NetworkAPI.get_unspent(self.address))
+
+    def _set_unspents(self, unspents):
+        with self.utxos.lock:
+            self.utxos.update(unspents)
+            # Outputs we spent may still be reported for a while.
+            self.unspents[:] = [unspent for unspent in unspents if unspent in self.utxos]
+            self.balance = sum(unspent.amount for unspent in self.unspents)
         return self.unspents
 
+    def _expire_reservations(self):
+        now = monotonic()
+        expired = [txid for txid, (_, expires) in self._reservations.items() if expires <= now]
+        for txid in expired:
+            self.release_transaction(txid)
+
+    def release_transaction(self, txid):
+        """Makes the unspents reserved by a transaction created with
+        :func:`~bitcoinpython.PrivateKey.create_transaction` and ``reserve``
+        available again, for when it will not be broadcast.
+
+        :param txid: The ID of the transaction.
+        :type txid: ``str``
+        """
+        reservation = self._reservations.pop(txid, None)
+        if reservation is not None:
+            self.utxos.release(reservation[0])
+
+    def mark_broadcast(self, txid):
+        """Drops the unspents spent by a transaction created with
+        :func:`~bitcoinpython.PrivateKey.create_transaction` and ``reserve``
+        once it was broadcast by other means. :func:`~bitcoinpython.PrivateKey.send`
+        does this itself.
+
+        :param txid: The ID of the transaction.
+        :type txid: ``str``
+        """
+        reservation = self._reservations.pop(txid, None)
+        if reservation is None:
+            return
+
+        with self.utxos.lock:
+            self.utxos.mark_spent(reservation[0])
+            self.unspents[:] = [unspent for unspent in self.unspents if unspent in self.utxos]
+            self.balance = sum(unspent.amount for unspent in self.unspents)
+
     def get_transactions(self):
         """Fetches transaction history.
 
@@ -201,7 +372,8 @@ class PrivateKey(BaseKey):
         return self.transactions
 
     def create_transaction(self, outputs, fee=None, leftover=None, combine=True,
-                           message=None, unspents=None, custom_pushdata=False):  # pragma: no cover
+                           message=None, unspents=None, custom_pushdata=False,
+                           cores=1, strategy=None, reserve=False):  # pragma: no cover
         """Creates a signed P2PKH transaction.
 
         :param outputs: A sequence of outputs you wish to send in the form
@@ -227,28 +399,84 @@ class PrivateKey(BaseKey):
                         stored in the blockchain forever. Due to size limits,
                         each message will be stored in chunks of 220 bytes.
         :type message: ``str``
-        :param unspents: The UTXOs to use as the inputs. By default bitcoinpython will
-                         communicate with the blockchain itself.
+        :param unspents: The UTXOs to use as the inputs. By default the
+                         unspents last fetched are used, skipping those
+                         reserved by other transactions created but not
+                         yet broadcast or released.
         :type unspents: ``list`` of :class:`~bitcoinpython.network.meta.Unspent`
+        :param cores: The number of processes to sign with, or ``'all'``. Only
+                      used once the inputs exceed the parallel signing
+                      threshold.
+        :type cores: ``int`` or ``str``
+        :param strategy: The coin selection strategy picking the inputs instead
+                         of ``combine``: ``'bnb'``, ``'largest_first'``,
+                         ``'smallest_first'``, ``'random_improve'`` or a
+                         function, see :func:`~bitcoinpython.coinselect.select_coins`.
+        :type strategy: ``str`` or ``function``
+        :param reserve: Whether to reserve the unspents picked, so that other
+                        transactions never spend them, until the transaction
+                        is passed to :func:`~bitcoinpython.PrivateKey.mark_broadcast`
+                        or :func:`~bitcoinpython.PrivateKey.release_transaction`,
+                        or ``RESERVATION_TTL`` seconds pass. Ignored when
+                        ``unspents`` are given.
+        :type reserve: ``bool``
         :returns: The signed transaction as hex.
         :rtype: ``str``
         """
 
-        unspents, outputs = sanitize_tx_data(
-            unspents or self.unspents,
-            outputs,
-            fee or get_fee(),
-            leftover or self.address,
-            combine=combine,
-            message=message,
-            compressed=self.is_compressed(),
-            custom_pushdata=custom_pushdata
-        )
-
-        return create_p2pkh_transaction(self, unspents, outputs, custom_pushdata=custom_pushdata)
+        fee = fee or get_fee()
+
+        if unspents:
+            unspents, outputs = sanitize_tx_data(
+                unspents,
+                outputs,
+                fee,
+                leftover or self.address,
+                combine=combine,
+                message=message,
+                compressed=self.is_compressed(),
+                custom_pushdata=custom_pushdata,
+                strategy=strategy
+            )
+
+            return create_p2pkh_transaction(self, unspents, outputs,
+                                            custom_pushdata=custom_pushdata, cores=cores)
+
+        # Select and reserve in one step so concurrent builders never pick
+        # the same unspents.
+        with self.utxos.lock:
+            self._expire_reservations()
+            self.utxos.update(self.unspents, fetched=False)
+            unspents, outputs = sanitize_tx_data(
+                self.utxos.available(),
+                outputs,
+                fee,
+                leftover or self.address,
+                combine=combine,
+                message=message,
+                compressed=self.is_compressed(),
+                custom_pushdata=custom_pushdata,
+                strategy=strategy
+            )
+            if reserve:
+                self.utxos.reserve(unspents)
+
+        if not reserve:
+            return create_p2pkh_transaction(self, unspents, outputs,
+                                            custom_pushdata=custom_pushdata, cores=cores)
+
+        try:
+            tx = build_p2pkh_transaction(self, unspents, outputs,
+                                         custom_pushdata=custom_pushdata, cores=cores)
+        except BaseException:
+            self.utxos.release(unspents)
+            raise
+
+        self._reservations[calc_txid(tx)] = (unspents, monotonic() + RESERVATION_TTL)
+        return bytes_to_hex(tx)
 
     def send(self, outputs, fee=None, leftover=None, combine=True,
-             message=None, unspents=None,x_api_key=None):  # pragma: no cover
+             message=None, unspents=None,x_api_key=None, cores=1, strategy=None):  # pragma: no cover
         """Creates a signed P2PKH transaction and attempts to broadcast it on
         the blockchain. This accepts the same arguments as
         :func:`~bitcoinpython.PrivateKey.create_transaction`.
@@ -279,21 +507,39 @@ class PrivateKey(BaseKey):
         :param unspents: The UTXOs to use as the inputs. By default bitcoinpython will
                          communicate with the blockchain itself.
         :type unspents: ``list`` of :class:`~bitcoinpython.network.meta.Unspent`
+        :param cores: The number of processes to sign with, or ``'all'``. Only
+                      used once the inputs exceed the parallel signing
+                      threshold.
+        :type cores: ``int`` or ``str``
+        :param strategy: The coin selection strategy picking the inputs instead
+                         of ``combine``: ``'bnb'``, ``'largest_first'``,
+                         ``'smallest_first'``, ``'random_improve'`` or a
+                         function, see :func:`~bitcoinpython.coinselect.select_coins`.
+        :type strategy: ``str`` or ``function``
         :returns: The transaction ID.
         :rtype: ``str``
         """
 
         tx_hex = self.create_transaction(
-            outputs, fee=fee, leftover=leftover, combine=combine, message=message, unspents=unspents
+            outputs, fee=fee, leftover=leftover, combine=combine, message=message, unspents=unspents,
+            cores=cores, strategy=strategy, reserve=True
         )
-        
-        NetworkAPI.broadcast_tx(tx_hex,x_api_key)
+        txid = calc_txid(tx_hex)
+
+        try:
+            NetworkAPI.broadcast_tx(tx_hex,x_api_key)
+        except BaseException:
+            self.release_transaction(txid)
+            raise
+
+        self.mark_broadcast(txid)
 
-        return calc_txid(tx_hex)
+        return txid
 
     @classmethod
     def prepare_transaction(cls, address, outputs, compressed=True, fee=None, leftover=None,
-                            combine=True, message=None, unspents=None):  # pragma: no cover
+                            combine=True, message=None, unspents=None,
+                            strategy=None):  # pragma: no cover
         """Prepares a P2PKH transaction for offline signing.
 
         :param address: The address the funds will be sent from.
@@ -327,6 +573,11 @@ class PrivateKey(BaseKey):
         :param unspents: The UTXOs to use as the inputs. By default bitcoinpython will
                          communicate with the blockchain itself.
         :type unspents: ``list`` of :class:`~bitcoinpython.network.meta.Unspent`
+        :param strategy: The coin selection strategy picking the inputs instead
+                         of ``combine``: ``'bnb'``, ``'largest_first'``,
+                         ``'smallest_first'``, ``'random_improve'`` or a
+                         function, see :func:`~bitcoinpython.coinselect.select_coins`.
+        :type strategy: ``str`` or ``function``
         :returns: JSON storing data required to create an offline transaction.
         :rtype: ``str``
         """
@@ -337,7 +588,8 @@ class PrivateKey(BaseKey):
             leftover or address,
             combine=combine,
             message=message,
-            compressed=compressed
+            compressed=compressed,
+            strategy=strategy
         )
 
         data = {
@@ -347,12 +599,16 @@ class PrivateKey(BaseKey):
 
         return json.dumps(data, separators=(',', ':'))
 
-    def sign_transaction(self, tx_data):  # pragma: no cover
+    def sign_transaction(self, tx_data, cores=1):  # pragma: no cover
         """Creates a signed P2PKH transaction using previously prepared
         transaction data.
 
         :param tx_data: Output of :func:`~bitcoinpython.PrivateKey.prepare_transaction`.
         :type tx_data: ``str``
+        :param cores: The number of processes to sign with, or ``'all'``. Only
+                      used once the inputs exceed the parallel signing
+                      threshold.
+        :type cores: ``int`` or ``str``
         :returns: The signed transaction as hex.
         :rtype: ``str``
         """
@@ -361,7 +617,7 @@ class PrivateKey(BaseKey):
         unspents = [Unspent.from_dict(unspent) for unspent in data['unspents']]
         outputs = data['outputs']
 
-        return create_p2pkh_transaction(self, unspents, outputs)
+        return create_p2pkh_transaction(self, unspents, outputs, cores=cores)
 
     @classmethod
     def from_hex(cls, hexed):
@@ -0,0 +1,53 @@
+import pytest
+
+from bitcoinpython.blockfile import BLOCK_HEADER_SIZE, MAIN_MAGIC, iter_block_file
+from bitcoinpython.transaction import int_to_varint
+
+# One input spending nothing and one empty output.
+RAW_TX = (
+    (1).to_bytes(4, 'little') + b'\x01' + b'\x00' * 32 + b'\xff' * 4 + b'\x00' + b'\xff' * 4 +
+    b'\x01' + b'\x00' * 8 + b'\x00' + b'\x00' * 4
+)
+
+
+def make_block(transactions, padding=0):
+    body = b'\x00' * BLOCK_HEADER_SIZE + int_to_varint(len(transactions)) + b''.join(transactions)
+    body += b'\x00' * padding
+    return MAIN_MAGIC + len(body).to_bytes(4, 'little') + body
+
+
+def write_blocks(tmp_path, data):
+    path = tmp_path / 'blk00000.dat'
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_yields_every_transaction(tmp_path):
+    path = write_blocks(tmp_path, make_block([RAW_TX]) + make_block([RAW_TX, RAW_TX]) + b'\x00' * 16)
+    transactions = list(iter_block_file(path))
+
+    assert len(transactions) == 3
+    assert transactions[0].to_bytes() == RAW_TX
+
+
+def test_truncated_block(tmp_path):
+    data = make_block([RAW_TX]) + make_block([RAW_TX])[:-10]
+    path = write_blocks(tmp_path, data)
+
+    with pytest.raises(ValueError, match='Truncated block'):
+        list(iter_block_file(path))
+
+
+def test_block_size_mismatch(tmp_path):
+    path = write_blocks(tmp_path, make_block([RAW_TX]) + make_block([RAW_TX], padding=5))
+
+    with pytest.raises(ValueError, match='does not match its size'):
+        list(iter_block_file(path))
+
+
+def test_stopping_early(tmp_path):
+    path = write_blocks(tmp_path, make_block([RAW_TX, RAW_TX]))
+    transactions = iter_block_file(path)
+
+    next(transactions)
+    transactions.close()
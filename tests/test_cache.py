@@ -0,0 +1,24 @@
+from bitcoinpython.network import cache
+from bitcoinpython.network.cache import FOREVER, LRUCache, cached
+
+
+class Lookups:
+    calls = 0
+
+    @classmethod
+    @cached(FOREVER)
+    def get(cls, key):
+        cls.calls += 1
+        return {'key': key, 'outputs': [1, 2]}
+
+
+def test_callers_get_their_own_copy(monkeypatch):
+    monkeypatch.setattr(cache, 'RESPONSE_CACHE', LRUCache())
+
+    first = Lookups.get('a')
+    first['outputs'].append(3)
+    second = Lookups.get('a')
+    second['key'] = 'b'
+
+    assert Lookups.get('a') == {'key': 'a', 'outputs': [1, 2]}
+    assert Lookups.calls == 1
@@ -0,0 +1,154 @@
+import random
+
+import pytest
+
+from bitcoinpython.coinselect import (
+    DUST_LIMIT, FeeModel, branch_and_bound, largest_first, random_improve, select_coins,
+    smallest_first
+)
+from bitcoinpython.exceptions import InsufficientFunds
+from bitcoinpython.network.meta import Unspent
+from bitcoinpython.transaction import P2PKH_OUTPUT_SIZE, TxSize
+
+FEE_RATE = 1
+
+
+def make_unspents(amounts):
+    return [Unspent(amount, 1, '', '{:064x}'.format(i), 0) for i, amount in enumerate(amounts)]
+
+
+def make_model(satoshis=FEE_RATE):
+    size = TxSize()
+    size.add_output(P2PKH_OUTPUT_SIZE)
+    return FeeModel(size, satoshis)
+
+
+def check_selection(selected, change, target, model):
+    total = sum(unspent.amount for unspent in selected)
+    fee = model.fee(len(selected), change=bool(change))
+
+    assert change == 0 or change >= DUST_LIMIT
+    if change:
+        assert total - target - fee == change
+    else:
+        # Anything left over goes to the miners, at least the fee.
+        assert total - target >= fee
+
+
+class TestFeeModel:
+    def test_fee_grows_with_inputs(self):
+        model = make_model()
+        assert model.fee(2) - model.fee(1) == model.input_fee
+
+    def test_change_output_costs_its_size(self):
+        model = make_model()
+        assert model.fee(1, change=True) - model.fee(1, change=False) == P2PKH_OUTPUT_SIZE
+
+    def test_fee_rate(self):
+        assert make_model(5).fee(3) == 5 * make_model(1).fee(3)
+
+
+class TestLargestFirst:
+    def test_uses_fewest_inputs(self):
+        unspents = make_unspents([1000, 50000, 3000, 100000])
+        model = make_model()
+        selected, change = select_coins(unspents, 60000, model, 'largest_first')
+
+        assert [unspent.amount for unspent in selected] == [100000]
+        check_selection(selected, change, 60000, model)
+
+    def test_skips_inputs_worth_less_than_their_fee(self):
+        model = make_model()
+        unspents = make_unspents([model.input_fee, 20000])
+        selected, change = largest_first(unspents, 10000, model)
+
+        assert [unspent.amount for unspent in selected] == [20000]
+
+    def test_insufficient_funds(self):
+        with pytest.raises(InsufficientFunds):
+            select_coins(make_unspents([1000, 2000]), 5000, make_model(), 'largest_first')
+
+
+class TestSmallestFirst:
+    def test_consolidates_small_inputs(self):
+        unspents = make_unspents([100000, 5000, 6000, 7000])
+        model = make_model()
+        selected, change = select_coins(unspents, 15000, model, 'smallest_first')
+
+        assert [unspent.amount for unspent in selected] == [5000, 6000, 7000]
+        check_selection(selected, change, 15000, model)
+
+    def test_dust_change_goes_to_fee(self):
+        model = make_model()
+        target = 10000
+        # Leaves less than the dust limit over once a change output is paid for.
+        amount = target + model.fee(1, change=True) + DUST_LIMIT - 1
+        selected, change = smallest_first(make_unspents([amount]), target, model)
+
+        assert change == 0
+        check_selection(selected, change, target, model)
+
+    def test_insufficient_funds(self):
+        with pytest.raises(InsufficientFunds):
+            select_coins(make_unspents([1000, 2000]), 5000, make_model(), 'smallest_first')
+
+
+class TestBranchAndBound:
+    def test_finds_changeless_match(self):
+        model = make_model()
+        target = 30000
+        # Exactly pays for the target and the fee of two inputs.
+        exact = target + model.fee(2, change=False) - 10000
+        unspents = make_unspents([100000, 10000, exact, 70000])
+        selected, change = select_coins(unspents, target, model, 'bnb')
+
+        assert change == 0
+        assert sorted(unspent.amount for unspent in selected) == sorted([10000, exact])
+
+    def test_falls_back_to_largest_first(self):
+        model = make_model()
+        unspents = make_unspents([100000, 200000])
+        selected, change = branch_and_bound(sorted(unspents, key=lambda u: u.amount), 10000, model)
+
+        assert [unspent.amount for unspent in selected] == [200000]
+        check_selection(selected, change, 10000, model)
+
+    def test_insufficient_funds(self):
+        with pytest.raises(InsufficientFunds):
+            select_coins(make_unspents([1000, 2000]), 5000, make_model(), 'bnb')
+
+
+class TestRandomImprove:
+    def test_change_is_never_dust(self):
+        rng = random.Random(0)
+        model = make_model()
+
+        for _ in range(500):
+            # Small amounts, so that improving often lands near the dust limit.
+            amounts = [rng.randint(200, 3000) for _ in range(rng.randint(1, 30))]
+            target = rng.randint(200, 2000)
+            candidates = sorted(make_unspents(amounts), key=lambda unspent: unspent.amount)
+
+            try:
+                selected, change = random_improve(candidates, target, model, rng=rng)
+            except InsufficientFunds:
+                continue
+
+            check_selection(selected, change, target, model)
+
+    def test_insufficient_funds(self):
+        with pytest.raises(InsufficientFunds):
+            select_coins(make_unspents([1000, 2000]), 5000, make_model(), 'random_improve')
+
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError):
+        select_coins(make_unspents([1000]), 500, make_model(), 'nope')
+
+
+def test_custom_strategy():
+    unspents = make_unspents([1000, 2000])
+    selected, change = select_coins(unspents, 500, make_model(),
+                                    lambda candidates, target, model: (candidates[:1], 0))
+
+    assert [unspent.amount for unspent in selected] == [1000]
@@ -0,0 +1,45 @@
+from bitcoinpython.network import NetworkAPI
+from bitcoinpython.network.meta import Unspent
+from bitcoinpython.wallet import PrivateKey
+
+FEE = 1
+SPENT_TXID = 'bb' * 32
+OTHER_TXID = 'cc' * 32
+
+
+def make_key(monkeypatch, fetched):
+    key = PrivateKey.from_int(123456789)
+    script = key.scriptcode.hex()
+
+    monkeypatch.setattr(NetworkAPI, 'get_unspent', classmethod(
+        lambda cls, address: [Unspent(amount, 1, script, txid, 0) for amount, txid in fetched]
+    ))
+    monkeypatch.setattr(NetworkAPI, 'broadcast_tx', classmethod(
+        lambda cls, tx_hex, x_api_key=None: None
+    ))
+
+    return key
+
+
+class TestSpentUnspents:
+    def test_stay_out_after_creating_another_transaction(self, monkeypatch):
+        # The provider keeps reporting the spent output after the send.
+        key = make_key(monkeypatch, [(100000, SPENT_TXID), (50000, OTHER_TXID)])
+        key.get_unspents()
+
+        key.send([(key.address, 60000, 'satoshi')], fee=FEE, strategy='largest_first')
+        key.create_transaction([(key.address, 10000, 'satoshi')], fee=FEE)
+        unspents = key.get_unspents()
+
+        assert [unspent.txid for unspent in unspents] == [OTHER_TXID]
+        assert key.utxos.is_spent(Unspent(100000, 1, '', SPENT_TXID, 0))
+
+    def test_forgotten_once_no_longer_fetched(self, monkeypatch):
+        key = make_key(monkeypatch, [(100000, SPENT_TXID)])
+        key.get_unspents()
+        key.send([(key.address, 60000, 'satoshi')], fee=FEE)
+
+        make_key(monkeypatch, [])
+        key.get_unspents()
+
+        assert not key.utxos.is_spent(Unspent(100000, 1, '', SPENT_TXID, 0))